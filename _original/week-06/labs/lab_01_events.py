@@ -1,29 +1,517 @@
 """
 Lab 6.1: Event System — Build a publish/subscribe system (Observer pattern).
 TODO: Implement EventBus with subscribe, emit, and @on decorator.
+Going further: wildcard subscriptions ('user.*', '*.created') via a pattern trie,
+delivery modes so one slow handler can't stall every publisher, and opt-in
+batch delivery (with optional coalescing) for high-frequency events, and weak
+subscriptions with O(1) unsubscribe through the handle subscribe() returns.
 """
+import asyncio, gc, queue, sys, threading, time, tracemalloc, weakref
 from collections import defaultdict
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+DELIVERY_MODES = ("inline", "thread", "async")
+
+class BackpressureError(Exception):
+    """Raised when a handler's queue stays full for longer than the emit timeout."""
+
+@dataclass
+class HandlerStats:
+    delivered: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    errors: int = 0
+    last_error: BaseException | None = None
+
+    def record(self, latency: float):
+        self.delivered += 1; self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def record_error(self, error: BaseException):
+        self.errors += 1; self.last_error = error
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    Handle returned by subscribe(): a handler plus its own queue (thread/async
+    modes), latency stats and batch buffer. Pass it to unsubscribe() to remove it.
+    """
+    handler: Callable          # or a weakref.ref / WeakMethod when weak=True
+    event_name: str = ""
+    name: str = ""
+    weak: bool = False
+    bucket: dict | None = None # the dict this handle lives in, for O(1) removal
+    queue: Any = None
+    stats: HandlerStats = field(default_factory=HandlerStats)
+    scheduled: bool = False    # thread mode: is a pool worker draining this queue?
+    lock: Any = field(default_factory=threading.Lock, repr=False)   # guards `scheduled` and `pending`
+    batch_size: int | None = None          # flush after this many events...
+    batch_interval: float | None = None    # ...or once the oldest is this many seconds old
+    coalesce_key: str | None = None        # keep only the latest event per data[coalesce_key]
+    pending: Any = None                    # list, or dict keyed by coalesce value
+    pending_since: float = 0.0
+
+    @property
+    def target(self) -> Callable | None:
+        """The handler to call, or None if a weakly held handler was garbage collected."""
+        return self.handler() if self.weak else self.handler
+
+    @property
+    def batched(self) -> bool:
+        return self.batch_size is not None or self.batch_interval is not None
+
+class _PatternNode:
+    """One dot-separated segment in the wildcard trie. '*' matches exactly one segment."""
+    __slots__ = ("children", "handlers")
 
-class EventBus:
     def __init__(self):
-        self._handlers = defaultdict(list)
+        self.children: dict[str, "_PatternNode"] = {}
+        self.handlers: dict[Subscription, None] = {}   # insertion-ordered set
+
+class EventBus:
+    def __init__(self, mode: str = "inline", max_workers: int = 4,
+                 max_queue: int = 1000, emit_timeout: float = 1.0,
+                 dispatch_cache_size: int = 1024):
+        if mode not in DELIVERY_MODES:
+            raise ValueError(f"mode must be one of {DELIVERY_MODES}, got {mode!r}")
+        self.mode = mode
+        self.max_queue = max_queue
+        self.emit_timeout = emit_timeout
+        self.dispatch_cache_size = dispatch_cache_size
+        self._handlers = defaultdict(dict)          # exact event names → {Subscription: None}
+        self._patterns = _PatternNode()             # names containing '*'
+        self._dispatch_cache: dict[str, list[Subscription]] = {}
+        self._subscriptions: dict[Subscription, None] = {}
+        self._lock = threading.Lock()               # guards the tables above and the cache
+        self._dead: list[Subscription] = []         # weak subscriptions collected while _lock was busy
+        self._pool = ThreadPoolExecutor(max_workers) if mode == "thread" else None
+        self._consumers: list[asyncio.Task] = []    # async mode: one task per subscription
+        self._flusher: threading.Thread | None = None   # inline/thread: flushes batch intervals
+        self._flush_tick: float | None = None
+        self._closing = threading.Event()
+
+    def subscribe(self, event_name: str, handler: Callable, batch_size: int | None = None,
+                  batch_interval_ms: float | None = None, coalesce_key: str | None = None,
+                  weak: bool = False) -> Subscription:
+        # TODO: Wrap handler in a Subscription (name=handler.__qualname__;
+        # convert batch_interval_ms to seconds; coalesce_key without a batch
+        # size/interval is a ValueError, as is batch_size < 1). In thread mode give it a
+        # queue.Queue(self.max_queue); in async mode an asyncio.Queue(self.max_queue)
+        # plus a consumer task running _consume(sub) (requires a running loop).
+        # With weak=True, hold weakref.WeakMethod(handler, cb) for bound methods
+        # (a plain weakref.ref would die immediately — the bound method is a
+        # temporary) or weakref.ref(handler, cb) otherwise, where cb calls
+        # self._discard(sub). Then, holding _lock (and after _reap()):
+        # exact names go in _handlers; names with a '*' segment are
+        # inserted into the _patterns trie one segment at a time. Add the
+        # handle to that dict (and to _subscriptions), remember it as sub.bucket,
+        # clear _dispatch_cache — it may now be stale — and return the handle.
+        # With a batch interval outside async mode, also lower _flush_tick to
+        # half the interval and, if _flusher is None, start it as a daemon
+        # threading.Thread(target=self._run_flusher).
+        pass
+
+    def unsubscribe(self, sub: Subscription) -> bool:
+        # TODO: Holding _lock: _reap(), then return _remove(sub)
+        pass
 
-    def subscribe(self, event_name: str, handler: Callable):
-        # TODO
+    def _remove(self, sub: Subscription) -> bool:
+        # TODO: Caller holds _lock. O(1) in the number of subscriptions: pop sub
+        # from sub.bucket and _subscriptions (return False if it was already
+        # removed) and clear _dispatch_cache. Drop an exact-name bucket once it's
+        # empty; for a pattern, walk sub.event_name's segments down the trie and
+        # delete nodes left with no handlers and no children, from the leaf up —
+        # otherwise unique patterns like 'session.<id>.*' leave nodes behind forever.
         pass
 
-    def on(self, event_name: str):
-        # TODO: Return a decorator that subscribes the function
+    def _discard(self, sub: Subscription):
+        # TODO: Weakref callback. It runs on whichever thread dropped the last
+        # reference — maybe a pool worker, maybe this thread while it already
+        # holds _lock — so never block on _lock here: if
+        # self._lock.acquire(blocking=False) succeeds, _remove(sub) and release;
+        # otherwise append sub to _dead for the next lock holder to remove.
+        pass
+
+    def _reap(self):
+        # TODO: Caller holds _lock. _remove() every subscription queued in _dead
+        pass
+
+    def on(self, event_name: str, **options):
+        # TODO: Return a decorator that subscribes the function (passing options through)
+        pass
+
+    def _match(self, event_name: str) -> list[Subscription]:
+        # TODO: Exact handlers first, then walk the trie: at each segment follow
+        # both the literal child and the '*' child, collecting handlers from
+        # nodes reached after the last segment. Cost depends on the name's
+        # depth, not on how many patterns are subscribed.
         pass
 
     def emit(self, event_name: str, **data):
-        # TODO: Call all handlers registered for this event
+        # TODO: Look up subscriptions in _dispatch_cache (no lock: cached lists
+        # are never mutated, only replaced). On a miss, hold _lock, _reap(), and
+        # call _match(event_name). Cache only non-empty matches, and once
+        # it holds dispatch_cache_size names evict the oldest first
+        # (del cache[next(iter(cache))] — dicts keep insertion order), so
+        # dynamic event names can't grow it forever. Then deliver data to each:
+        # - inline: call _deliver(sub, data) right here
+        # - thread: sub.queue.put(data, timeout=self.emit_timeout), raising
+        #   BackpressureError on queue.Full; then _schedule(sub)
+        # - async: sub.queue.put_nowait(data), raising BackpressureError on
+        #   asyncio.QueueFull (use publish() to wait for space instead)
+        pass
+
+    async def publish(self, event_name: str, **data):
+        # TODO: Async mode only — like emit, but `await sub.queue.put(data)`
+        # so a full queue suspends the publisher instead of raising
+        pass
+
+    def _deliver(self, sub: Subscription, data: dict):
+        # TODO: Unbatched: call sub.target(data) — skipping a collected weak
+        # handler (target is None) — timing it with
+        # time.perf_counter() and recording the latency in sub.stats.
+        # Batched: hand off to _buffer(sub, data) instead.
+        pass
+
+    def _schedule(self, sub: Subscription):
+        # TODO: Thread mode. *With sub.lock held*, if not sub.scheduled, mark it
+        # and submit _drain(sub) to the pool. One worker per handler at a time
+        # keeps each handler's events in order; without the lock two publisher
+        # threads can both see scheduled == False and start two drains of the
+        # same queue.
+        pass
+
+    def _buffer(self, sub: Subscription, data: dict):
+        # TODO: Holding sub.lock, add data to sub.pending (start pending_since on
+        # the first item). With coalesce_key, pending is a dict: pop the key then
+        # re-insert so the latest event wins and sits at the end. Once the lock
+        # is released, _flush_sub(sub) if len(pending) reached batch_size or
+        # _due(sub).
+        pass
+
+    def _due(self, sub: Subscription) -> bool:
+        # TODO: True if sub has a batch_interval, something pending, and
+        # pending_since is at least batch_interval old
         pass
 
+    def _flush_sub(self, sub: Subscription):
+        # TODO: Holding sub.lock, take sub.pending and reset it to None; then,
+        # with the lock released (a slow handler mustn't block emit), call
+        # sub.target(list_of_events) once if anything was taken and record one
+        # latency sample. The caller's thread, a drain worker and the flusher
+        # may all get here; the swap under the lock hands each event to
+        # exactly one of them.
+        pass
+
+    def _run_flusher(self):
+        # TODO: Flusher thread body. Until _closing is set (wait on it with
+        # _flush_tick as the timeout, like a watcher's poll loop), check every
+        # subscription in list(self._subscriptions) with _due(sub): inline mode
+        # calls _flush_sub(sub) here; thread mode calls _schedule(sub) instead,
+        # so the batch is delivered by the drain worker and the handler still
+        # sees one call at a time. Async mode needs no thread — _consume waits
+        # on its queue with a timeout. A partial batch is thus delivered
+        # within about 1.5 intervals even if no further event arrives.
+        pass
+
+    def flush(self):
+        # TODO: Flush every batched subscription now, due or not — close()
+        # and aclose() call it to deliver what's left.
+        pass
+
+    def _drain(self, sub: Subscription):
+        # TODO: Thread mode worker: _deliver queued items until sub.queue is
+        # empty (get_nowait). Wrap each delivery in try/except Exception,
+        # passing the error to sub.stats.record_error(), and call task_done()
+        # in a finally — one raising handler must not end the drain, or
+        # scheduled stays True, nothing drains that queue again, publishers
+        # hit BackpressureError and close() waits in join() forever. Then,
+        # with sub.lock held, check the queue again: still empty → clear
+        # sub.scheduled and return; otherwise keep draining. An emit that lands
+        # after the check finds scheduled == False and submits a new drain, so
+        # no event is stranded and no two drains ever overlap. Before that
+        # check, flush sub's batch if _due(sub) — the flusher schedules a
+        # drain for exactly that, and catches errors the same way. If anything
+        # still escapes (a BaseException), clear scheduled under sub.lock in
+        # a finally before it propagates.
+        pass
+
+    async def _consume(self, sub: Subscription):
+        # TODO: Async mode consumer loop: await sub.queue.get(), await the
+        # handler if it's a coroutine function (otherwise call it), record
+        # latency, then sub.queue.task_done(). Batched subscriptions use a
+        # synchronous handler through _deliver like the other modes; while a
+        # batch is pending, wait with asyncio.wait_for(sub.queue.get(), time
+        # left until it's due) and _flush_sub(sub) on asyncio.TimeoutError so
+        # the interval holds without new events. As in _drain, catch Exception
+        # around each delivery (record_error) and call task_done() in a
+        # finally: an uncaught error would end this task, and publish() and
+        # aclose() would then wait forever.
+        pass
+
+    def metrics(self) -> list[dict]:
+        # TODO: One dict per subscription, in subscription order:
+        # {"handler": sub.name, "queue_depth": ..., "delivered": ...,
+        #  "errors": ..., "avg_latency": ..., "max_latency": ...}
+        # queue_depth is sub.queue.qsize(), or 0 in inline mode
+        pass
+
+    def close(self):
+        # TODO: Set _closing and join the flusher if one was started.
+        # Thread mode: join() every subscription queue, then shut the pool down.
+        # All modes: flush() any partially filled batches, then _reap() under _lock.
+        # Iterate over list(self._subscriptions): workers may remove entries meanwhile.
+        pass
+
+    async def aclose(self):
+        # TODO: Async mode: await every queue's join(), then cancel the consumer
+        # tasks, then flush() any partially filled batches
+        pass
+
+def demo_slow_subscriber():
+    """A slow handler stalls the publisher inline, but not in thread mode."""
+    for mode in ("inline", "thread"):
+        bus = EventBus(mode=mode)
+        bus.subscribe("tick", lambda event: time.sleep(0.05))
+        bus.subscribe("tick", lambda event: None)
+        start = time.perf_counter()
+        for i in range(10):
+            bus.emit("tick", n=i)
+        publish_time = time.perf_counter() - start
+        bus.close()
+        print(f"  {mode:>6}: publisher blocked for {publish_time:.3f}s")
+        for stats in bus.metrics():
+            print(f"          {stats}")
+
+def demo_concurrent_publishers(publishers: int = 4, events: int = 2_000):
+    """Several threads emit at once; each handler still sees one event at a time, in order."""
+    bus = EventBus(mode="thread")
+    active, overlaps, last_seen = 0, 0, {}
+    def handler(event):
+        nonlocal active, overlaps
+        active += 1
+        if active > 1:
+            overlaps += 1
+        assert event["n"] > last_seen.get(event["publisher"], -1), "events reordered"
+        last_seen[event["publisher"]] = event["n"]
+        active -= 1
+    sub = bus.subscribe("tick", handler)
+    def publish(p):
+        for n in range(events):
+            bus.emit("tick", publisher=p, n=n)
+    threads = [threading.Thread(target=publish, args=(p,)) for p in range(publishers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    bus.close()
+    assert not sub.stats.errors, f"handler raised {sub.stats.errors} times: {sub.stats.last_error!r}"
+    assert overlaps == 0, f"handler ran concurrently {overlaps} times"
+    assert bus.metrics()[0]["delivered"] == publishers * events
+    print(f"  thread: {publishers} publishers, {publishers * events:,} events delivered in order")
+
+def demo_failing_subscriber(events: int = 100):
+    """A handler that raises is counted in its stats; it doesn't stall publishers or close()."""
+    def flaky(event):
+        if event["n"] % 2:
+            raise RuntimeError(f"cannot handle {event['n']}")
+    def check(mode, sub, received):
+        assert (sub.stats.delivered, sub.stats.errors) == (events // 2, events // 2)
+        assert isinstance(sub.stats.last_error, RuntimeError)
+        assert received == list(range(events)), "other handlers must keep receiving"
+        print(f"  {mode:>6}: {sub.stats.errors} handler errors recorded, "
+              f"{len(received)} events still delivered to the healthy handler")
+
+    received = []
+    bus = EventBus(mode="thread", max_queue=10)   # 10x fewer slots than events
+    sub = bus.subscribe("tick", flaky)
+    bus.subscribe("tick", lambda event: received.append(event["n"]))
+    for i in range(events):
+        bus.emit("tick", n=i)
+    bus.close()
+    check("thread", sub, received)
+
+    async def run_async():
+        received = []
+        bus = EventBus(mode="async", max_queue=10)
+        sub = bus.subscribe("tick", flaky)
+        bus.subscribe("tick", lambda event: received.append(event["n"]))
+        for i in range(events):
+            await bus.publish("tick", n=i)
+        await bus.aclose()
+        check("async", sub, received)
+    asyncio.run(run_async())
+
+def demo_batch_interval(interval_ms: float = 50):
+    """A partial batch is delivered once its interval passes, even if no more events arrive."""
+    async def run(mode):
+        bus = EventBus(mode=mode)
+        batches = []
+        bus.subscribe("tick", batches.append, batch_interval_ms=interval_ms)
+        for i in range(3):
+            bus.emit("tick", n=i)
+        start = time.perf_counter()
+        while not batches and time.perf_counter() - start < 1.0:
+            await asyncio.sleep(interval_ms / 1000 / 10)
+        waited = time.perf_counter() - start
+        if mode == "async":
+            await bus.aclose()
+        else:
+            bus.close()
+        assert batches == [[{"n": 0}, {"n": 1}, {"n": 2}]], f"{mode}: {batches}"
+        assert waited < 2 * interval_ms / 1000, f"{mode}: batch took {waited * 1000:.0f} ms"
+        print(f"  {mode:>6}: partial batch delivered after {waited * 1000:.0f} ms "
+              f"(interval {interval_ms:g} ms)")
+    for mode in DELIVERY_MODES:
+        asyncio.run(run(mode))
+
+async def demo_async_mode():
+    """Coroutine handlers run concurrently, each fed from its own queue."""
+    bus = EventBus(mode="async", max_queue=5)
+    async def slow(event):
+        await asyncio.sleep(0.05)
+    async def fast(event):
+        pass
+    bus.subscribe("tick", slow)
+    bus.subscribe("tick", fast)
+    start = time.perf_counter()
+    for i in range(20):
+        await bus.publish("tick", n=i)    # waits whenever slow's queue is full
+    await bus.aclose()
+    print(f"  async: 20 events delivered in {time.perf_counter() - start:.3f}s")
+    for stats in bus.metrics():
+        print(f"         {stats}")
+
+def benchmark_batching(num_events: int = 200_000, batch_size: int = 100, num_keys: int = 1_000):
+    """Compare per-event delivery against batched and coalesced delivery."""
+    for label, options in [("per-event", {}),
+                           (f"batch={batch_size}", {"batch_size": batch_size}),
+                           (f"coalesce({num_keys} keys)", {"batch_interval_ms": 10,
+                                                           "coalesce_key": "user_id"})]:
+        bus = EventBus()
+        received = calls = 0
+        def handler(events):
+            nonlocal received, calls
+            calls += 1
+            received += len(events) if isinstance(events, list) else 1
+        bus.subscribe("user.created", handler, **options)
+        start = time.perf_counter()
+        for i in range(num_events):
+            bus.emit("user.created", user_id=i % num_keys, n=i)
+        bus.close()                       # flushes stragglers and stops the flusher
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>20}: {num_events / elapsed:>12,.0f} events/s, "
+              f"{calls:,} handler calls, {received:,} events delivered")
+
+def soak_test_weak_subscriptions(cycles: int = 50_000, report_every: int = 10_000):
+    """
+    Subscribe bound methods of short-lived objects weakly (exact names and
+    unique wildcard patterns), drop the objects, and check that neither the
+    subscription tables, the pattern trie nor traced memory grow.
+
+    The default run takes seconds; `python lab_01_events.py --soak` runs the
+    full 10^6 cycles (a few minutes under tracemalloc).
+    """
+    class Widget:
+        def on_event(self, event):
+            pass
+
+    bus = EventBus()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(1, cycles + 1):
+        widget = Widget()
+        bus.subscribe(f"widget.{i % 100}", widget.on_event, weak=True)
+        bus.subscribe(f"session.{i}.*", widget.on_event, weak=True)
+        if i % 10 == 0:
+            bus.emit(f"widget.{i % 100}", n=i)
+            bus.emit(f"session.{i}.ping", n=i)
+        del widget                        # last strong ref: both subscriptions should vanish
+        if i % report_every == 0:
+            growth = tracemalloc.get_traced_memory()[0] - baseline
+            print(f"  {i:>9,} cycles: {len(bus._subscriptions)} live subscriptions, "
+                  f"{growth / 1024:,.1f} KiB above baseline")
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    assert not bus._subscriptions and not bus._handlers, "Dead weak subscriptions were not cleaned up"
+    assert not bus._patterns.children, "Empty pattern trie nodes were not pruned"
+    assert growth < 1024 * 1024, f"Memory grew by {growth:,} bytes over {cycles:,} cycles"
+
+    # Thread mode: the last reference often dies on a pool worker, mid-emit
+    threaded = EventBus(mode="thread")
+    for i in range(cycles // 20):
+        widget = Widget()
+        threaded.subscribe(f"widget.{i % 100}", widget.on_event, weak=True)
+        threaded.subscribe(f"session.{i}.*", widget.on_event, weak=True)
+        threaded.emit(f"widget.{i % 100}", n=i)
+        threaded.emit(f"session.{i}.ping", n=i)
+        del widget
+    threaded.close()
+    assert not threaded._subscriptions and not threaded._patterns.children
+
+    # Strong subscriptions are removed in O(1) through their handle
+    handles = [bus.subscribe("tick", lambda event: None) for _ in range(1_000)]
+    for handle in handles:
+        assert bus.unsubscribe(handle) is True
+    assert bus.unsubscribe(handles[0]) is False
+    assert not bus._subscriptions
+    print("  ✓ weak subscriptions cleaned up, unsubscribe via handles works")
+
+def benchmark_emit(num_subscriptions: int = 10_000, num_emits: int = 100_000):
+    """Time emit() with many exact and wildcard subscriptions registered."""
+    bus = EventBus()
+    calls = 0
+    def handler(event):
+        nonlocal calls
+        calls += 1
+    for i in range(num_subscriptions):
+        if i % 3 == 0:
+            bus.subscribe(f"topic{i}.*", handler)
+        elif i % 3 == 1:
+            bus.subscribe(f"*.action{i}", handler)
+        else:
+            bus.subscribe(f"topic{i}.created", handler)
+    names = [f"topic{i}.created" for i in range(0, num_subscriptions, 3)]
+    start = time.perf_counter()
+    for i in range(num_emits):
+        bus.emit(names[i % len(names)], n=i)
+    elapsed = time.perf_counter() - start
+    assert calls == num_emits, f"Each emit should hit exactly one wildcard handler, got {calls} calls"
+    for i in range(10 * bus.dispatch_cache_size):   # dynamic names, most with no subscribers
+        bus.emit(f"topic{i}.session{i}", n=i)
+    assert len(bus._dispatch_cache) <= bus.dispatch_cache_size, "dispatch cache must stay bounded"
+    print(f"{num_emits:,} emits over {num_subscriptions:,} subscriptions: "
+          f"{elapsed:.3f}s ({num_emits / elapsed:,.0f} emits/s)")
+
 if __name__ == "__main__":
     bus = EventBus()
     @bus.on("user.created")
     def log_user(event):
         print(f"  New user: {event}")
+    @bus.on("user.*")
+    def audit_user(event):
+        print(f"  Audit (user.*): {event}")
+    @bus.on("*.created")
+    def count_created(event):
+        print(f"  Created (*.created): {event}")
     bus.emit("user.created", username="Alice")
+    bus.emit("order.created", order_id=42)
+    @bus.on("user.created", batch_size=2)
+    def bulk_insert(events):
+        print(f"  Batch of {len(events)}: {events}")
+    bus.emit("user.created", username="Bob")
+    bus.emit("user.created", username="Carol")
+    demo_slow_subscriber()
+    demo_concurrent_publishers()
+    demo_failing_subscriber()
+    demo_batch_interval()
+    asyncio.run(demo_async_mode())
+    if "--soak" in sys.argv[1:]:
+        soak_test_weak_subscriptions(1_000_000, report_every=200_000)
+    else:
+        soak_test_weak_subscriptions()
+    benchmark_batching()
+    benchmark_emit()
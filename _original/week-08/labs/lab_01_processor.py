@@ -1,9 +1,18 @@
 """
 Lab 8.1: Resilient Data Processor — Process records with comprehensive error handling.
 TODO: Implement a processor that validates, transforms, and reports on failures.
+Going further: stream records in chunks from any iterable, reporting progress and
+keeping a bounded sample of errors (plus exact counts per error type) so memory
+stays flat no matter how large or how broken the feed is. Then spread the chunks
+over a thread or process pool, merging each worker's partial result, and replace
+the ad-hoc checks with a declarative schema compiled once into a validator.
 """
+import os, random, time, tracemalloc
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
 
 @dataclass
 class ProcessingResult:
@@ -11,19 +20,193 @@ class ProcessingResult:
     succeeded: int = 0
     failed: int = 0
     errors: list = field(default_factory=list)
+    error_counts: Counter = field(default_factory=Counter)   # exact, by exception type name
+    max_errors: int | None = None                            # None keeps every error
 
     def record_success(self):
         self.total += 1; self.succeeded += 1
 
     def record_failure(self, item, error):
         self.total += 1; self.failed += 1
+        # TODO: Count type(error).__name__ in error_counts. Then keep at most
+        # max_errors entries in errors via reservoir sampling: append while
+        # there's room, otherwise pick j = random.randrange(self.failed) and
+        # replace errors[j] if j < max_errors — every failure so far is equally
+        # likely to be in the sample. Only build the dict (str(item) can be
+        # large) when it's actually kept.
         self.errors.append({"item": str(item), "error": str(error)})
 
+    def merge(self, other: "ProcessingResult") -> "ProcessingResult":
+        # TODO: Return a new result combining self and other without changing
+        # either: add the counters and error_counts. If the two error samples
+        # together exceed max_errors, fill each slot from self's sample with
+        # probability (self failures left) / (failures left on both sides) and
+        # otherwise from other's, so the merged sample stays uniform. Merging
+        # must be associative: (a.merge(b)).merge(c) == a.merge(b.merge(c)) in counts.
+        pass
+
+class SchemaError(ValueError):
+    """A record failed schema validation; field names the culprit (None: not a dict)."""
+    def __init__(self, field: str | None, message: str):
+        super().__init__(f"{field}: {message}" if field else message)
+        self.field = field
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    type: type | tuple[type, ...] = object
+    required: bool = True
+    min: float | None = None
+    max: float | None = None
+
+RECORD_SCHEMA = (Field("id", int), Field("name", str), Field("value", (int, float), min=0))
+
+def compile_schema(schema: Iterable[Field]) -> Callable[[Any], dict]:
+    # TODO: Generate the source of one specialized function, the way
+    # namedtuple/dataclasses do, and exec() it once:
+    #     def validate(record):
+    #         if not isinstance(record, dict): raise SchemaError(None, "expected a dict, ...")
+    #         try: v = record['id']
+    #         except KeyError: raise SchemaError('id', 'missing') from None
+    #         if not isinstance(v, t0): raise SchemaError('id', 'expected int, ...')
+    #         ...                                   # min/max checks only where set
+    #         return record
+    # Field names only ever enter the source as repr() literals —
+    # f"record[{f.name!r}]", f"SchemaError({f.name!r}, ...)" — never pasted
+    # between quotes by hand, or a name containing a quote or backslash breaks
+    # (or injects code into) the generated function. Types and bounds go in
+    # the exec namespace (t0, lo0, hi0, ...), not the source text; an optional
+    # field uses record.get(name, _MISSING) and skips its checks when absent.
+    # No loops over the schema at call time.
+    pass
+
 class DataProcessor:
+    def __init__(self, schema: Iterable[Field] | None = None):
+        # TODO: If a schema is given, keep it and shadow the method with
+        # self.validate = compile_schema(schema). exec'd functions can't be
+        # pickled, so define __getstate__/__setstate__ to drop the compiled
+        # validator and recompile it — process pools pickle the processor.
+        self.schema = schema
+
+    def validate(self, record: Any) -> dict:
+        # TODO: Return record if it's a dict with 'id', 'name' and a non-negative
+        # numeric 'value'; otherwise raise TypeError / KeyError / ValueError
+        pass
+
+    def transform(self, record: dict) -> dict:
+        # TODO: Return a new dict, e.g. with 'name' stripped and title-cased
+        pass
+
     def process_records(self, records: list[dict]) -> ProcessingResult:
         # TODO: Validate each record, transform valid ones, catch/log errors
+        # (can simply drain process_stream(records, max_errors=None) — callers
+        # of this list-in, result-out API expect every error, not a sample)
+        pass
+
+    def iter_processed(self, records: Iterable, result: ProcessingResult,
+                       chunk_size: int = 10_000,
+                       progress: Callable[[ProcessingResult], None] | None = None,
+                       progress_every: int = 1_000_000) -> Iterator[dict]:
+        # TODO: Pull records chunk_size at a time with islice(iter(records), ...)
+        # and yield each transformed record, recording successes and
+        # (TypeError, KeyError, ValueError) failures in result. After each chunk,
+        # call progress(result) once every progress_every records. Never hold
+        # more than one chunk — records may be a generator of 10^8 items.
         pass
 
+    def process_stream(self, records: Iterable, chunk_size: int = 10_000,
+                       progress: Callable[[ProcessingResult], None] | None = None,
+                       progress_every: int = 1_000_000,
+                       max_errors: int | None = 100) -> ProcessingResult:
+        # TODO: Create a ProcessingResult(max_errors=max_errors), drain
+        # iter_processed() into it (discarding the outputs) and return it
+        pass
+
+def _process_chunk(processor: DataProcessor, chunk: list, max_errors: int | None) -> tuple[list[dict], ProcessingResult]:
+    """Worker entry point: process one chunk into (outputs, partial result)."""
+    # TODO: Run processor.iter_processed(chunk, result, chunk_size=len(chunk) or 1)
+    # into a list with a fresh ProcessingResult(max_errors=max_errors); return both.
+    # Module-level so ProcessPoolExecutor can pickle it.
+    pass
+
+def iter_parallel(processor: DataProcessor, records: Iterable, result: ProcessingResult,
+                  mode: str = "thread", workers: int | None = None,
+                  chunk_size: int = 10_000) -> Iterator[dict]:
+    """
+    Like processor.iter_processed(), but chunks are handled by a worker pool.
+
+    mode="thread" suits I/O-bound transforms (the GIL is released while
+    waiting); mode="process" suits CPU-bound ones. Outputs are yielded in
+    input order, and each chunk's partial result is merged into result.
+    """
+    # TODO: Create the executor (workers defaults to os.cpu_count()). Don't use
+    # executor.map — it consumes the whole input up front. Instead keep a deque
+    # of at most 2 * workers futures: submit _process_chunk for each new chunk,
+    # and when the deque is full pop the *oldest* future, merge its partial
+    # result into result (copy the merged fields back — result is the caller's
+    # object) and yield its outputs. Drain the remaining futures at the end.
+    pass
+
+def process_parallel(processor: DataProcessor, records: Iterable, mode: str = "thread",
+                     workers: int | None = None, chunk_size: int = 10_000,
+                     max_errors: int | None = 100) -> ProcessingResult:
+    # TODO: Drain iter_parallel() into a fresh ProcessingResult and return it
+    pass
+
+def generate_records(n: int, bad_ratio: float = 0.1, seed: int = 0) -> Iterator[Any]:
+    """Yield n synthetic records, roughly bad_ratio of them invalid in one of three ways."""
+    rng = random.Random(seed)
+    for i in range(n):
+        roll = rng.random()
+        if roll >= bad_ratio:
+            yield {"id": i, "name": f" user {i} ", "value": rng.randint(0, 1000)}
+        elif roll < bad_ratio / 3:
+            yield {"id": i, "value": 1}                 # missing 'name'
+        elif roll < 2 * bad_ratio / 3:
+            yield f"record {i}"                         # not a dict
+        else:
+            yield {"id": i, "name": "x", "value": -1}   # negative value
+
+def benchmark_stream(sizes=(100_000, 1_000_000)):
+    """Peak memory should stay flat as the feed grows (a list would grow with it)."""
+    processor = DataProcessor()
+    for n in sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = processor.process_stream(generate_records(n, bad_ratio=0.5))
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {n:>10,} records: {n / elapsed:>9,.0f} records/s, peak {peak / 1024:,.0f} KiB, "
+              f"{len(result.errors)} sampled errors, counts {dict(result.error_counts)}")
+
+def benchmark_validation(n: int = 500_000):
+    """Per-record cost of the handwritten validate() vs the compiled schema."""
+    records = list(islice(generate_records(10_000), 10_000)) * (n // 10_000)
+    validators = [("handwritten", DataProcessor().validate),
+                  ("compiled", DataProcessor(RECORD_SCHEMA).validate)]
+    for label, validate in validators:
+        start = time.perf_counter()
+        for record in records:
+            try:
+                validate(record)
+            except (TypeError, KeyError, ValueError):
+                pass
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>11}: {elapsed / len(records) * 1e9:6.0f} ns per record")
+
+def benchmark_parallel(n: int = 200_000, workers: int | None = None):
+    """Serial vs thread pool vs process pool throughput on the same feed."""
+    processor = DataProcessor()
+    runs = [("serial", lambda: processor.process_stream(generate_records(n))),
+            ("threads", lambda: process_parallel(processor, generate_records(n), "thread", workers)),
+            ("processes", lambda: process_parallel(processor, generate_records(n), "process", workers))]
+    for label, run in runs:
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>9}: {n / elapsed:>9,.0f} records/s ({result.succeeded:,} ok, {result.failed:,} failed)")
+
 if __name__ == "__main__":
     records = [
         {"id": 1, "name": "Alice", "value": 150},
@@ -34,3 +217,41 @@ if __name__ == "__main__":
     processor = DataProcessor()
     result = processor.process_records(records)
     print(f"Processed: {result.succeeded}/{result.total} succeeded")
+    assert len(result.errors) == result.failed == 3
+    full = processor.process_records(list(generate_records(5_000)))
+    assert len(full.errors) == full.failed > 100, "process_records keeps every error"
+
+    result = processor.process_stream(generate_records(50_000), chunk_size=1_000, max_errors=10,
+                                      progress=lambda r: print(f"  ... {r.total:,} records, {r.failed:,} failed"),
+                                      progress_every=10_000)
+    assert result.total == 50_000 and len(result.errors) == 10
+    assert sum(result.error_counts.values()) == result.failed
+    serial = processor.process_stream(generate_records(20_000))
+    for mode in ("thread", "process"):
+        outputs, result = [], ProcessingResult(max_errors=100)
+        outputs.extend(iter_parallel(processor, generate_records(20_000), result, mode, workers=2, chunk_size=1_000))
+        assert [r["id"] for r in outputs] == sorted(r["id"] for r in outputs), "input order must be kept"
+        assert (result.succeeded, result.failed, result.error_counts) == (serial.succeeded, serial.failed, serial.error_counts)
+        assert len(result.errors) == 100
+    strict = DataProcessor(RECORD_SCHEMA)
+    for bad, culprit in [({"id": 2, "value": 50}, "name"), ("not a dict", None),
+                         ({"id": 4, "name": "Bob", "value": -10}, "value"), ({"id": "4", "name": "B", "value": 1}, "id")]:
+        try:
+            strict.validate(bad)
+        except SchemaError as e:
+            assert e.field == culprit, (bad, e)
+        else:
+            raise AssertionError(f"{bad!r} should fail")
+    odd = compile_schema([Field("it's a \\ name", int, min=0)])
+    assert odd({"it's a \\ name": 1}) == {"it's a \\ name": 1}
+    try:
+        odd({})
+        raise AssertionError("missing field should fail")
+    except SchemaError as e:
+        assert e.field == "it's a \\ name"
+    expected = strict.process_stream(generate_records(5_000))
+    pooled = process_parallel(strict, generate_records(5_000), "process", workers=2)   # must pickle
+    assert (pooled.succeeded, pooled.failed) == (expected.succeeded, expected.failed)
+    benchmark_stream()
+    benchmark_validation()
+    benchmark_parallel()
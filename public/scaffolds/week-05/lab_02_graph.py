@@ -6,10 +6,19 @@ Implement graph operations using dicts (adjacency lists) and deque (BFS).
 Practice choosing the right data structure for each operation.
 """
 
+import random
+import time
+from array import array
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Iterator, Sequence
 
 
-def build_graph(edges: list[tuple[str, str]]) -> dict[str, set[str]]:
+def build_graph(
+    edges: list[tuple[str, str]], presorted: bool = False
+) -> dict[str, set[str]] | dict[str, tuple[str, ...]]:
     """
     Build an undirected graph from a list of edges.
 
@@ -18,33 +27,63 @@ def build_graph(edges: list[tuple[str, str]]) -> dict[str, set[str]]:
 
     Return a dict mapping each node to a set of its neighbors.
 
+    If presorted is True, build the sets first, then convert each one
+    into a sorted tuple in a single final pass. Traversals can walk
+    these tuples directly instead of calling sorted() at every node,
+    so the sorting cost is paid once per graph, not once per traversal.
+
     Example:
         build_graph([("A", "B"), ("B", "C")])
         → {"A": {"B"}, "B": {"A", "C"}, "C": {"B"}}
+
+        build_graph([("A", "B"), ("B", "C")], presorted=True)
+        → {"A": ("B",), "B": ("A", "C"), "C": ("B",)}
     """
     # TODO: Implement
     pass
 
 
-def bfs(graph: dict[str, set[str]], start: str) -> list[str]:
+def iter_bfs(
+    graph: dict[str, set[str]] | dict[str, tuple[str, ...]], start: str
+) -> Iterator[str]:
     """
-    Perform breadth-first search starting from 'start'.
+    Breadth-first search as a generator: yield each node as it is visited.
 
-    Return a list of nodes in the order they were visited.
+    Because nodes are produced lazily, callers can stop early (e.g. with
+    a break, next(), or itertools.islice) without exploring the rest of
+    the graph.
 
     Hints:
     - Use a deque as your queue (append to add, popleft to remove)
     - Use a set to track visited nodes
     - Process neighbors in sorted order for deterministic results
+    - If the neighbors are a tuple (from build_graph(..., presorted=True)),
+      they are already sorted — iterate them as-is instead of calling sorted()
 
     Example:
         graph = {"A": {"B", "C"}, "B": {"A"}, "C": {"A"}}
-        bfs(graph, "A") → ["A", "B", "C"]
+        next(iter_bfs(graph, "A")) → "A"
     """
     # TODO: Implement
     pass
 
 
+def bfs(graph: dict[str, set[str]] | dict[str, tuple[str, ...]], start: str) -> list[str]:
+    """
+    Perform breadth-first search starting from 'start'.
+
+    Return a list of nodes in the order they were visited.
+
+    Hint: once iter_bfs works, this is a one-liner.
+
+    Example:
+        graph = {"A": {"B", "C"}, "B": {"A"}, "C": {"A"}}
+        bfs(graph, "A") → ["A", "B", "C"]
+    """
+    # TODO: Implement using iter_bfs
+    pass
+
+
 def shortest_path(graph: dict[str, set[str]], start: str, end: str) -> list[str] | None:
     """
     Find the shortest path between two nodes using BFS.
@@ -94,6 +133,123 @@ def has_cycle(graph: dict[str, set[str]]) -> bool:
     pass
 
 
+# ============================================================
+# Going Further: Batch Hop Distances
+# ============================================================
+#
+# Calling bfs() once per seed is fine for a handful of seeds, but
+# thousands of seeds repeat the same dict lookups and hashing every
+# time. A compact, read-only array layout (CSR) makes each traversal
+# cheaper and lets several processes share one copy of the graph.
+
+def to_csr(
+    graph: dict[str, set[str]] | dict[str, tuple[str, ...]]
+) -> tuple[list[str], array, array]:
+    """
+    Convert an adjacency dict into compressed sparse row (CSR) form.
+
+    Return a tuple (nodes, offsets, targets):
+    - nodes: all node names in sorted order; a node's index is its
+      position in this list
+    - offsets: array("i") of length len(nodes) + 1
+    - targets: array("i") of neighbor indices
+
+    The neighbors of node i are targets[offsets[i]:offsets[i + 1]],
+    in ascending index order (which matches sorted name order).
+
+    Example:
+        to_csr(build_graph([("A", "B"), ("B", "C")]))
+        → (["A", "B", "C"], array("i", [0, 1, 3, 4]), array("i", [1, 0, 2, 1]))
+    """
+    # TODO: Implement
+    pass
+
+
+def hop_distances(
+    offsets: Sequence[int],
+    targets: Sequence[int],
+    source: int,
+    max_depth: int | None = None,
+) -> array:
+    """
+    BFS over CSR arrays from a single source index.
+
+    Return an array("i") with one slot per node: the number of hops from
+    source, or -1 if the node is unreachable. If max_depth is given, do
+    not expand nodes at that depth — anything further away stays -1.
+
+    offsets and targets may be arrays or memoryviews (see
+    multi_source_distances), so only use indexing and slicing on them.
+
+    Hints:
+    - Start with array("i", [-1]) * (len(offsets) - 1)
+    - The distance array doubles as the visited set: -1 means unvisited
+    """
+    # TODO: Implement
+    pass
+
+
+_shared_csr: tuple | None = None
+
+
+def _attach_csr(offsets_name: str, targets_name: str, num_offsets: int, num_targets: int) -> None:
+    """
+    Worker initializer: attach to the shared CSR blocks once per process.
+
+    Open each block with shared_memory.SharedMemory(name=...), then wrap
+    its buffer with shm.buf[:n * array("i").itemsize].cast("i") so the
+    worker reads the parent's memory directly instead of unpickling a copy.
+    Slice *before* casting: a block can be bigger than requested (rounded up
+    to a page, or the 1-byte minimum for an empty array), and cast() needs a
+    whole number of items. Store the two views in the module-level _shared_csr.
+
+    Hint: keep references to the SharedMemory objects too, or the views will
+    point at a closed buffer — and put them *first*: _shared_csr = (shm_o,
+    shm_t, offsets, targets). A tuple frees its items last-first, so the
+    views are released before the blocks close; the other order makes every
+    spawned worker print "BufferError: cannot close exported pointers exist"
+    at exit (spawn is the default start method on macOS).
+    """
+    # TODO: Implement
+    pass
+
+
+def _distances_from(args: tuple[int, int | None]) -> array:
+    """Worker task: run hop_distances over the attached _shared_csr."""
+    # TODO: Implement
+    pass
+
+
+def multi_source_distances(
+    graph: dict[str, set[str]] | dict[str, tuple[str, ...]],
+    sources: list[str],
+    max_depth: int | None = None,
+    workers: int | None = None,
+) -> dict[str, array]:
+    """
+    Compute hop distances from many sources using a process pool.
+
+    Return a dict mapping each source name to its distance array (indexed
+    like the nodes list from to_csr).
+
+    Steps:
+    1. Convert the graph with to_csr() once
+    2. Copy offsets and targets into two shared_memory.SharedMemory blocks
+       (size = max(1, len(arr) * arr.itemsize) — SharedMemory rejects size=0,
+       which an edgeless graph's empty targets array would ask for); copy
+       the bytes with shm.buf[:nbytes] = arr.tobytes()
+    3. Start a ProcessPoolExecutor(max_workers=workers) with
+       initializer=_attach_csr so each worker attaches to the blocks once
+    4. map _distances_from over (source_index, max_depth) pairs — pass
+       chunksize > 1 so thousands of small tasks don't each pay IPC overhead
+    5. In a finally block, close() and unlink() both blocks
+
+    Raise KeyError if a source is not in the graph.
+    """
+    # TODO: Implement
+    pass
+
+
 # ============================================================
 # Tests
 # ============================================================
@@ -114,6 +270,27 @@ def test_bfs():
     print("✓ bfs passed")
 
 
+def test_build_graph_presorted():
+    g = build_graph([("C", "A"), ("B", "A"), ("A", "D")], presorted=True)
+    assert g["A"] == ("B", "C", "D")
+    assert g["B"] == ("A",)
+    assert all(isinstance(neighbors, tuple) for neighbors in g.values())
+    print("✓ build_graph(presorted=True) passed")
+
+
+def test_iter_bfs():
+    edges = [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")]
+    g = build_graph(edges)
+    frozen = build_graph(edges, presorted=True)
+    assert list(iter_bfs(g, "A")) == ["A", "B", "C", "D"]
+    assert list(iter_bfs(frozen, "A")) == ["A", "B", "C", "D"]
+    assert bfs(g, "A") == bfs(frozen, "A")
+
+    # Early exit: only the first two nodes are produced
+    assert list(islice(iter_bfs(g, "A"), 2)) == ["A", "B"]
+    print("✓ iter_bfs passed")
+
+
 def test_shortest_path():
     g = build_graph([("A", "B"), ("B", "C"), ("C", "D"), ("A", "D")])
     path = shortest_path(g, "A", "D")
@@ -143,10 +320,132 @@ def test_has_cycle():
     print("✓ has_cycle passed")
 
 
+def test_to_csr():
+    nodes, offsets, targets = to_csr(build_graph([("B", "C"), ("A", "B")]))
+    assert nodes == ["A", "B", "C"]
+    assert list(offsets) == [0, 1, 3, 4]
+    assert list(targets) == [1, 0, 2, 1]
+    print("✓ to_csr passed")
+
+
+def test_hop_distances():
+    # A - B - C - D, plus isolated pair E - F
+    g = build_graph([("A", "B"), ("B", "C"), ("C", "D"), ("E", "F")])
+    nodes, offsets, targets = to_csr(g)
+    dist = hop_distances(offsets, targets, nodes.index("A"))
+    assert list(dist) == [0, 1, 2, 3, -1, -1]
+
+    capped = hop_distances(offsets, targets, nodes.index("A"), max_depth=2)
+    assert list(capped) == [0, 1, 2, -1, -1, -1]
+    print("✓ hop_distances passed")
+
+
+def test_multi_source_distances():
+    g = build_graph([("A", "B"), ("B", "C"), ("C", "D"), ("A", "D"), ("E", "F")])
+    nodes, offsets, targets = to_csr(g)
+    result = multi_source_distances(g, ["A", "C", "E"], workers=2)
+    assert set(result) == {"A", "C", "E"}
+    for source, dist in result.items():
+        assert list(dist) == list(hop_distances(offsets, targets, nodes.index(source)))
+
+    capped = multi_source_distances(g, ["A"], max_depth=1, workers=2)
+    assert list(capped["A"]) == [0, 1, -1, 1, -1, -1]
+
+    # No edges at all: the targets block is empty
+    assert list(multi_source_distances({"A": set()}, ["A"], workers=1)["A"]) == [0]
+
+    try:
+        multi_source_distances(g, ["Z"], workers=1)
+        assert False, "Should raise KeyError"
+    except KeyError:
+        pass
+    print("✓ multi_source_distances passed")
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def _random_edges(num_nodes: int, avg_degree: int, seed: int = 42) -> list[tuple[str, str]]:
+    """A connected, seeded random edge list so every run sees the same graph."""
+    rng = random.Random(seed)
+    nodes = [f"n{i}" for i in range(num_nodes)]
+    edges = [(nodes[i], nodes[i + 1]) for i in range(num_nodes - 1)]
+    edges += [
+        (rng.choice(nodes), rng.choice(nodes))
+        for _ in range(num_nodes * avg_degree // 2)
+    ]
+    return edges
+
+
+def benchmark_bfs(num_nodes: int = 20_000, avg_degree: int = 8, repeats: int = 20):
+    """
+    Time repeated BFS over one fixed graph, with and without presorting.
+
+    Uses a seeded random graph so every run sees the same edges.
+    """
+    edges = _random_edges(num_nodes, avg_degree)
+    start_node = edges[0][0]
+
+    results = {}
+    for presorted in (False, True):
+        start = time.perf_counter()
+        graph = build_graph(edges, presorted=presorted)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            order = bfs(graph, start_node)
+        traverse_time = time.perf_counter() - start
+
+        results[presorted] = order
+        label = "presorted tuples" if presorted else "sets + sorted()"
+        print(f"{label:>17}: build {build_time:.3f}s, "
+              f"{repeats} traversals {traverse_time:.3f}s "
+              f"({traverse_time / repeats * 1000:.1f} ms each)")
+
+    assert results[False] == results[True], "Presorting must not change the visit order"
+
+
+def benchmark_multi_source(num_nodes: int = 20_000, avg_degree: int = 8,
+                           num_sources: int = 200, workers: int = 4):
+    """
+    Compare one-at-a-time hop_distances calls against the process pool.
+    """
+    graph = build_graph(_random_edges(num_nodes, avg_degree), presorted=True)
+    nodes, offsets, targets = to_csr(graph)
+    index = {name: i for i, name in enumerate(nodes)}
+    sources = nodes[:num_sources]
+
+    start = time.perf_counter()
+    serial = {s: hop_distances(offsets, targets, index[s]) for s in sources}
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = multi_source_distances(graph, sources, workers=workers)
+    parallel_time = time.perf_counter() - start
+
+    assert serial == parallel, "Parallel distances must match the serial ones"
+    print(f"          serial: {num_sources} sources in {serial_time:.3f}s")
+    print(f"{workers} worker processes: {num_sources} sources in {parallel_time:.3f}s "
+          f"({serial_time / max(parallel_time, 1e-9):.1f}x)")
+
+
 if __name__ == "__main__":
     test_build_graph()
+    test_build_graph_presorted()
     test_bfs()
+    test_iter_bfs()
     test_shortest_path()
     test_connected_components()
     test_has_cycle()
+    test_to_csr()
+    test_hop_distances()
+    test_multi_source_distances()
     print("\nAll tests passed! ✓")
+
+    print("\nBenchmark: repeated BFS on a fixed graph")
+    benchmark_bfs()
+
+    print("\nBenchmark: hop distances from many sources")
+    benchmark_multi_source()
@@ -7,11 +7,44 @@ Practice abstract methods, properties, and operator overloading.
 """
 
 from abc import ABC, abstractmethod
+from array import array
+import bisect
+from collections import Counter
+from functools import cached_property
+from operator import itemgetter
+import heapq
 import math
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Sequence
+
+try:
+    import numpy as np  # optional: vectorized area math in ColumnarShapeCollection
+except ImportError:
+    np = None
 
 
 class Shape(ABC):
-    """Abstract base class for all shapes."""
+    """
+    Abstract base class for all shapes.
+
+    Shapes are immutable: subclasses store their dimensions in private
+    attributes (e.g. self._radius) once, in __init__, and expose them through
+    read-only properties. Because a shape can never change, its area and
+    perimeter can be computed once and cached (see cached_area).
+
+    Shape itself declares empty __slots__ so that subclasses can opt out of
+    a per-instance __dict__ entirely (see the Slotted* classes below).
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        if not name.startswith("_") or hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable; cannot set {name!r}")
+        super().__setattr__(name, value)
 
     @abstractmethod
     def area(self) -> float:
@@ -23,17 +56,27 @@ class Shape(ABC):
         """Return the perimeter of the shape."""
         ...
 
+    @cached_property
+    def cached_area(self) -> float:
+        """area(), computed on first access and then stored on the instance."""
+        return self.area()
+
+    @cached_property
+    def cached_perimeter(self) -> float:
+        """perimeter(), computed on first access and then stored on the instance."""
+        return self.perimeter()
+
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(area={self.area():.2f})"
+        return f"{self.__class__.__name__}(area={self.cached_area:.2f})"
 
     def __lt__(self, other: "Shape") -> bool:
         """Compare shapes by area for sorting."""
-        # TODO: Implement
+        # TODO: Implement — compare cached_area so sorting doesn't recompute areas
         pass
 
     def __eq__(self, other: object) -> bool:
         """Two shapes are equal if they have the same area (within tolerance)."""
-        # TODO: Implement — use math.isclose
+        # TODO: Implement — use math.isclose on cached_area
         pass
 
 
@@ -74,8 +117,8 @@ class Rectangle(Shape):
     A rectangle defined by width and height.
 
     Properties:
-    - width: float (must be positive)
-    - height: float (must be positive)
+    - width: float (must be positive, read-only)
+    - height: float (must be positive, read-only)
     - is_square: bool (True if width == height)
     """
 
@@ -83,6 +126,16 @@ class Rectangle(Shape):
         # TODO: Validate both > 0
         pass
 
+    @property
+    def width(self) -> float:
+        # TODO: Implement
+        pass
+
+    @property
+    def height(self) -> float:
+        # TODO: Implement
+        pass
+
     @property
     def is_square(self) -> bool:
         # TODO: Implement
@@ -103,12 +156,20 @@ class Triangle(Shape):
 
     Validate that the sides form a valid triangle (triangle inequality).
     Use Heron's formula for area.
+
+    Properties:
+    - sides: tuple[float, float, float] (read-only)
     """
 
     def __init__(self, a: float, b: float, c: float):
         # TODO: Validate all > 0 and triangle inequality holds
         pass
 
+    @property
+    def sides(self) -> tuple[float, float, float]:
+        # TODO: Implement
+        pass
+
     def area(self) -> float:
         # TODO: Implement using Heron's formula
         # s = (a + b + c) / 2
@@ -124,34 +185,331 @@ class ShapeCollection:
     """
     A collection of shapes with aggregate operations.
     Uses composition (has-a list of shapes) rather than inheritance.
+
+    The list is kept sorted by area as shapes are added, with a parallel
+    list of areas as the sort key, so queries never re-sort:
+    - add: O(log n) to find the slot with bisect, then an O(n) list.insert —
+      a memmove, quick per call, but n adds cost O(n²); use add_many to bulk-load
+    - largest: O(1) — it's the last element
+    - sorted_by_area: O(n) copy, no sorting
+
+    A second sorted index keyed by perimeter and a per-type Counter are
+    maintained the same way, so range queries cost O(log n + k) and
+    count_by_type is O(number of types).
     """
 
     def __init__(self):
         self._shapes: list[Shape] = []
+        self._areas: list[float] = []     # self._areas[i] == self._shapes[i].cached_area
+        self._by_perimeter: list[Shape] = []
+        self._perimeters: list[float] = []
+        self._type_counts: Counter[str] = Counter()
+        self._total_area = 0.0
 
     def add(self, shape: Shape) -> None:
+        # TODO: Implement — find the insertion point with
+        # bisect.bisect_right(self._areas, shape.cached_area), insert into both
+        # lists at that index, and update the running total.
+        # Do the same for _perimeters/_by_perimeter (keyed by cached_perimeter),
+        # and count type(shape).__name__ in _type_counts.
+        pass
+
+    def add_many(self, shapes: list[Shape]) -> None:
+        """
+        Bulk-load shapes, keeping every index consistent with add().
+
+        Each list.insert in add() shifts the elements after it, so n single
+        adds cost O(n²) element moves — minutes at 10^6 shapes. Instead,
+        append everything and re-sort each index once: Timsort spots that the
+        old part is already sorted, so this is O(n + m log m) for m new shapes.
+
+        Hint: rebuild _shapes/_areas from
+        sorted(zip(self._areas + new_areas, self._shapes + shapes), key=itemgetter(0)),
+        keying on the number only so shapes themselves are never compared.
+        """
         # TODO: Implement
         pass
 
     def total_area(self) -> float:
         """Return the sum of all shape areas."""
-        # TODO: Implement
+        # TODO: Implement — maintained by add()
         pass
 
     def largest(self) -> Shape:
         """Return the shape with the largest area."""
-        # TODO: Implement — use max() with a key
+        # TODO: Implement — no max() needed, the list is already sorted
         pass
 
     def sorted_by_area(self) -> list[Shape]:
         """Return shapes sorted by area (smallest first)."""
-        # TODO: Implement — the __lt__ method makes shapes sortable
+        # TODO: Implement — return a copy so callers can't break the ordering
+        pass
+
+    def in_area_range(self, low: float, high: float) -> list[Shape]:
+        """
+        Return shapes with low <= area <= high, smallest first.
+
+        Hint: bisect_left(self._areas, low) and bisect_right(self._areas, high)
+        give the slice boundaries — no scan over the other shapes.
+        """
+        # TODO: Implement
+        pass
+
+    def in_perimeter_range(self, low: float, high: float) -> list[Shape]:
+        """Return shapes with low <= perimeter <= high, smallest first."""
+        # TODO: Implement — same idea, on the perimeter index
+        pass
+
+    def top_k(self, k: int, key: str | Callable[[Shape], float] = "area") -> list[Shape]:
+        """
+        Return the k shapes with the largest key, largest first.
+
+        key is "area" or "perimeter" (answered from the sorted indexes in
+        O(k)) or any function of a shape. For a function there's no index,
+        so use heapq.nlargest(k, ..., key=key): O(n log k) with only k items
+        held at a time, rather than sorting all n.
+        """
+        # TODO: Implement
+        pass
+
+    def count_by_type(self) -> dict[str, int]:
+        """Return {"Circle": 3, "Rectangle": 1, ...} from the maintained Counter."""
+        # TODO: Implement
         pass
 
     def __len__(self) -> int:
         return len(self._shapes)
 
 
+# ============================================================
+# Going Further: Compact Shapes with __slots__
+# ============================================================
+#
+# Every Circle above carries a per-instance __dict__ — a hash table that
+# costs more memory than the one float it holds. Declaring __slots__ stores
+# attributes in fixed fields on the instance instead. (A frozen dataclass
+# with slots=True gets you the same layout with less typing.)
+
+class SlottedCircle(Shape):
+    """
+    Circle without a per-instance __dict__.
+
+    Same validation and read-only properties as Circle. cached_property needs
+    a __dict__ to store its result in, so compute the area eagerly in __init__
+    and keep it in a slot instead.
+
+    Fill the slots with object.__setattr__(self, "_radius", radius): a plain
+    self._radius = ... goes through Shape.__setattr__, whose hasattr() check
+    raises and swallows an AttributeError for every unset slot — enough to
+    make the slotted classes build slower than the dict-based ones.
+    """
+
+    __slots__ = ("_radius", "_area")
+
+    def __init__(self, radius: float):
+        # TODO: Validate radius > 0 (ValueError), then set _radius and _area
+        # with object.__setattr__
+        pass
+
+    @property
+    def radius(self) -> float:
+        # TODO: Implement
+        pass
+
+    @property
+    def diameter(self) -> float:
+        # TODO: Implement
+        pass
+
+    @property
+    def cached_area(self) -> float:
+        return self._area
+
+    @property
+    def cached_perimeter(self) -> float:
+        return self.perimeter()
+
+    def area(self) -> float:
+        # TODO: Implement — return the stored area
+        pass
+
+    def perimeter(self) -> float:
+        # TODO: Implement
+        pass
+
+
+class SlottedRectangle(Shape):
+    """Rectangle without a per-instance __dict__ (see SlottedCircle)."""
+
+    __slots__ = ("_width", "_height", "_area")
+
+    def __init__(self, width: float, height: float):
+        # TODO: Validate both > 0, then set _width, _height and _area
+        # with object.__setattr__
+        pass
+
+    @property
+    def width(self) -> float:
+        # TODO: Implement
+        pass
+
+    @property
+    def height(self) -> float:
+        # TODO: Implement
+        pass
+
+    @property
+    def is_square(self) -> bool:
+        # TODO: Implement
+        pass
+
+    @property
+    def cached_area(self) -> float:
+        return self._area
+
+    @property
+    def cached_perimeter(self) -> float:
+        return self.perimeter()
+
+    def area(self) -> float:
+        # TODO: Implement — return the stored area
+        pass
+
+    def perimeter(self) -> float:
+        # TODO: Implement
+        pass
+
+
+class SlottedTriangle(Shape):
+    """Triangle without a per-instance __dict__ (see SlottedCircle)."""
+
+    __slots__ = ("_a", "_b", "_c", "_area")
+
+    def __init__(self, a: float, b: float, c: float):
+        # TODO: Validate like Triangle, then set the sides and _area (Heron's
+        # formula) with object.__setattr__
+        pass
+
+    @property
+    def sides(self) -> tuple[float, float, float]:
+        # TODO: Implement
+        pass
+
+    @property
+    def cached_area(self) -> float:
+        return self._area
+
+    @property
+    def cached_perimeter(self) -> float:
+        return self.perimeter()
+
+    def area(self) -> float:
+        # TODO: Implement — return the stored area
+        pass
+
+    def perimeter(self) -> float:
+        # TODO: Implement
+        pass
+
+
+# ============================================================
+# Going Further: Columnar Storage
+# ============================================================
+#
+# A list of Shape objects costs a full Python object per shape, and every
+# area() call is a method dispatch. Storing each kind's dimensions in typed
+# arrays ("structure of arrays") lets us compute a whole column of areas in
+# one pass — and with NumPy, in one vectorized expression.
+
+class ColumnarShapeCollection:
+    """
+    Drop-in alternative to ShapeCollection backed by array("d") columns.
+
+    Circles keep their radii, rectangles their widths and heights, and
+    triangles their three sides, each in its own typed array. Shape objects
+    are only created when the public API returns them (largest,
+    sorted_by_area, iteration).
+
+    If NumPy is installed and use_numpy is True, area/perimeter math runs on
+    np.frombuffer() views of the columns (no copy). Otherwise it falls back to
+    plain Python loops over the arrays — still no per-shape method dispatch.
+    """
+
+    def __init__(self, use_numpy: bool = True):
+        self.use_numpy = use_numpy and np is not None
+        self._radii = array("d")
+        self._widths = array("d")
+        self._heights = array("d")
+        self._sides_a = array("d")
+        self._sides_b = array("d")
+        self._sides_c = array("d")
+
+    def add(self, shape: Shape) -> None:
+        """
+        Store a Shape's dimensions in the matching columns.
+
+        Raise TypeError for a Shape kind without columns.
+        """
+        # TODO: Implement — isinstance() dispatch to the add_* methods below
+        # (accept the Slotted* variants too: isinstance(shape, (Circle, SlottedCircle)))
+        pass
+
+    def add_circle(self, radius: float) -> None:
+        """Append a circle without building a Circle object (same validation)."""
+        # TODO: Implement
+        pass
+
+    def add_rectangle(self, width: float, height: float) -> None:
+        """Append a rectangle without building a Rectangle object."""
+        # TODO: Implement
+        pass
+
+    def add_triangle(self, a: float, b: float, c: float) -> None:
+        """Append a triangle without building a Triangle object."""
+        # TODO: Implement
+        pass
+
+    def areas(self) -> dict[str, Sequence[float]]:
+        """
+        Return {"circle": ..., "rectangle": ..., "triangle": ...}, each the
+        areas of that kind in insertion order.
+
+        NumPy path: r = np.frombuffer(self._radii); np.pi * r * r, and so on
+        (Heron's formula vectorizes too). Pure-Python path: return array("d")
+        built from a generator over the columns.
+        """
+        # TODO: Implement
+        pass
+
+    def perimeters(self) -> dict[str, Sequence[float]]:
+        """Like areas(), for perimeters."""
+        # TODO: Implement
+        pass
+
+    def total_area(self) -> float:
+        """Return the sum of all shape areas."""
+        # TODO: Implement — sum each column of areas() (np.sum or math.fsum)
+        pass
+
+    def largest(self) -> Shape:
+        """Return the shape with the largest area, as a Shape object."""
+        # TODO: Implement — find the max of each column, then build only the winner
+        pass
+
+    def sorted_by_area(self) -> list[Shape]:
+        """Return shapes sorted by area (smallest first), as Shape objects."""
+        # TODO: Implement — sort (kind, index) pairs by area, then build shapes
+        pass
+
+    def _build(self, kind: str, i: int) -> Shape:
+        """Materialize row i of a kind's columns as a Shape object."""
+        # TODO: Implement
+        pass
+
+    def __len__(self) -> int:
+        return len(self._radii) + len(self._widths) + len(self._sides_a)
+
+
 # ============================================================
 # Tests
 # ============================================================
@@ -198,6 +556,65 @@ def test_comparison():
     print("✓ Shape comparison passed")
 
 
+def test_immutable_cached():
+    c = Circle(5)
+    assert c.cached_area == c.area()
+    assert c.cached_area is c.cached_area      # computed once, then stored
+    try:
+        c.radius = 10
+        assert False, "Shapes should be immutable"
+    except AttributeError:
+        pass
+    r = Rectangle(4, 6)
+    assert (r.width, r.height) == (4, 6)
+    assert Triangle(3, 4, 5).sides == (3, 4, 5)
+    print("✓ Immutable shapes with cached area passed")
+
+
+def test_collection_queries():
+    coll = ShapeCollection()
+    coll.add_many([Circle(1), Rectangle(4, 6), Triangle(3, 4, 5)])
+    coll.add(Circle(5))
+    coll.add(Rectangle(1, 1))
+    # areas: 1, 3.14, 6, 24, 78.5 — perimeters: 4, 6.28, 12, 20, 31.4
+    assert [s.area() for s in coll.in_area_range(3, 24)] == [math.pi, 6, 24]
+    assert coll.in_area_range(100, 200) == []
+    assert [s.perimeter() for s in coll.in_perimeter_range(5, 20)] == [2 * math.pi, 12, 20]
+    assert [type(s) for s in coll.top_k(2)] == [Circle, Rectangle]
+    assert [s.perimeter() for s in coll.top_k(2, key="perimeter")] == [10 * math.pi, 20]
+    assert coll.top_k(1, key=lambda s: -s.area())[0].area() == 1
+    assert coll.count_by_type() == {"Circle": 2, "Rectangle": 2, "Triangle": 1}
+    print("✓ ShapeCollection queries passed")
+
+
+def test_slotted_shapes():
+    pairs = [(Circle(5), SlottedCircle(5)),
+             (Rectangle(4, 6), SlottedRectangle(4, 6)),
+             (Triangle(3, 4, 5), SlottedTriangle(3, 4, 5))]
+    for plain, slotted in pairs:
+        assert not hasattr(slotted, "__dict__"), f"{type(slotted).__name__} should not have a __dict__"
+        assert isinstance(slotted, Shape)
+        assert math.isclose(plain.area(), slotted.area())
+        assert math.isclose(plain.perimeter(), slotted.perimeter())
+        assert plain == slotted
+    assert SlottedCircle(5).diameter == 10
+    assert SlottedRectangle(5, 5).is_square is True
+    assert SlottedTriangle(3, 4, 5).sides == (3, 4, 5)
+    for bad in (lambda: SlottedCircle(-1), lambda: SlottedRectangle(0, 2),
+                lambda: SlottedTriangle(1, 2, 10)):
+        try:
+            bad()
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+    try:
+        SlottedCircle(1)._radius = 2
+        assert False, "Slotted shapes should be immutable too"
+    except AttributeError:
+        pass
+    print("✓ Slotted shapes passed")
+
+
 def test_collection():
     coll = ShapeCollection()
     coll.add(Circle(5))
@@ -207,13 +624,194 @@ def test_collection():
     assert coll.largest().area() == max(s.area() for s in [Circle(5), Rectangle(4, 6), Triangle(3, 4, 5)])
     sorted_shapes = coll.sorted_by_area()
     assert sorted_shapes[0].area() <= sorted_shapes[1].area() <= sorted_shapes[2].area()
+
+    # The index stays sorted however shapes arrive
+    coll = ShapeCollection()
+    shapes = [SHAPE_CLASSES[kind](*dims) for kind, dims in _random_shape_dims(200)]
+    for shape in shapes:
+        coll.add(shape)
+    assert [s.area() for s in coll.sorted_by_area()] == sorted(s.area() for s in shapes)
+    assert coll.largest().area() == max(s.area() for s in shapes)
+    assert math.isclose(coll.total_area(), sum(s.area() for s in shapes), rel_tol=1e-9)
     print("✓ ShapeCollection passed")
 
 
+def _random_shape_dims(n: int, seed: int = 7):
+    """Yield n seeded (kind, dims) pairs: a third each of circles, rectangles, triangles."""
+    rng = random.Random(seed)
+    for i in range(n):
+        if i % 3 == 0:
+            yield "circle", (rng.uniform(0.1, 10),)
+        elif i % 3 == 1:
+            yield "rectangle", (rng.uniform(0.1, 10), rng.uniform(0.1, 10))
+        else:
+            a, b = rng.uniform(1, 10), rng.uniform(1, 10)
+            yield "triangle", (a, b, rng.uniform(abs(a - b) + 0.01, a + b - 0.01))
+
+
+SHAPE_CLASSES = {"circle": Circle, "rectangle": Rectangle, "triangle": Triangle}
+
+
+def test_columnar_collection():
+    for use_numpy in (False, True):
+        coll = ColumnarShapeCollection(use_numpy=use_numpy)
+        coll.add(Circle(5))
+        coll.add(Rectangle(4, 6))
+        coll.add_triangle(3, 4, 5)
+        assert len(coll) == 3
+        assert isinstance(coll.largest(), Circle)
+        assert math.isclose(coll.total_area(), Circle(5).area() + 24 + 6, rel_tol=1e-9)
+        assert [type(s) for s in coll.sorted_by_area()] == [Triangle, Rectangle, Circle]
+        assert math.isclose(coll.perimeters()["rectangle"][0], 20)
+        try:
+            coll.add_circle(-1)
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+
+        # Same answers as the object-based collection on random data
+        objects, columns = ShapeCollection(), ColumnarShapeCollection(use_numpy=use_numpy)
+        for kind, dims in _random_shape_dims(300):
+            objects.add(SHAPE_CLASSES[kind](*dims))
+            columns.add(SHAPE_CLASSES[kind](*dims))
+        assert math.isclose(objects.total_area(), columns.total_area(), rel_tol=1e-9)
+        assert math.isclose(objects.largest().area(), columns.largest().area(), rel_tol=1e-9)
+        assert [round(s.area(), 9) for s in objects.sorted_by_area()] == \
+               [round(s.area(), 9) for s in columns.sorted_by_area()]
+        if np is None:
+            break
+    print("✓ ColumnarShapeCollection passed")
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def benchmark_queries(n: int = 1_000_000, repeats: int = 100):
+    """
+    Query latency on an indexed ShapeCollection of n shapes, against a
+    linear scan over the same shapes for comparison.
+    """
+    coll = ShapeCollection()
+    start = time.perf_counter()
+    coll.add_many([SHAPE_CLASSES[kind](*dims) for kind, dims in _random_shape_dims(n)])
+    print(f"  built {n:,} shapes in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    for kind, dims in _random_shape_dims(1_000, seed=8):
+        coll.add(SHAPE_CLASSES[kind](*dims))
+    print(f"  then 1,000 incremental add() calls: "
+          f"{(time.perf_counter() - start) * 1e3:.1f} µs each")
+    shapes = coll.sorted_by_area()
+
+    queries = {
+        "area in [50, 50.5]": (lambda: coll.in_area_range(50, 50.5),
+                               lambda: [s for s in shapes if 50 <= s.cached_area <= 50.5]),
+        "perimeter in [20, 20.1]": (lambda: coll.in_perimeter_range(20, 20.1),
+                                    lambda: [s for s in shapes if 20 <= s.cached_perimeter <= 20.1]),
+        "top 10 by perimeter": (lambda: coll.top_k(10, key="perimeter"),
+                                lambda: heapq.nlargest(10, shapes, key=lambda s: s.cached_perimeter)),
+        "count by type": (coll.count_by_type,
+                          lambda: Counter(type(s).__name__ for s in shapes)),
+    }
+    for label, (indexed, scan) in queries.items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            indexed()
+        indexed_time = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        scan()
+        scan_time = time.perf_counter() - start
+        print(f"  {label:>24}: indexed {indexed_time * 1e6:9.1f} µs, "
+              f"scan {scan_time * 1e6:12.1f} µs")
+
+
+def benchmark_slots(n: int = 200_000):
+    """
+    Report bytes per instance and construction throughput, dict vs slots.
+
+    Bytes per instance are measured with tracemalloc over n live instances,
+    so they include the __dict__ (and its values) — not just the
+    sys.getsizeof() of the object header. Both passes read cached_area once
+    per shape: the slotted classes compute it in __init__, the others lazily.
+    """
+    cases = [("Circle", Circle, SlottedCircle, (5.0,)),
+             ("Rectangle", Rectangle, SlottedRectangle, (4.0, 6.0)),
+             ("Triangle", Triangle, SlottedTriangle, (3.0, 4.0, 5.0))]
+    for name, plain_cls, slotted_cls, args in cases:
+        for cls in (plain_cls, slotted_cls):
+            # Measure construction without tracemalloc's overhead...
+            start = time.perf_counter()
+            shapes = [cls(*args) for _ in range(n)]
+            for shape in shapes:
+                shape.cached_area
+            elapsed = time.perf_counter() - start
+            del shapes
+
+            # ...then memory with it, minus the list that holds them.
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            shapes = [cls(*args) for _ in range(n)]
+            for shape in shapes:
+                shape.cached_area           # include the cached area in the footprint
+            used = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            per_instance = (used - sys.getsizeof(shapes)) / n
+            del shapes
+            print(f"  {cls.__name__:>16}: {per_instance:6.0f} bytes/instance, "
+                  f"{n / elapsed:>12,.0f} constructions/s")
+
+
+def benchmark_columnar(n: int = 10_000_000, object_n: int = 1_000_000):
+    """
+    Time loading and total_area() for the columnar backend at n shapes.
+
+    The object-based ShapeCollection is measured at object_n (10^7 Shape
+    objects need several GB of RAM); compare the per-shape columns.
+    Load times include generating the random dimensions.
+    """
+    start = time.perf_counter()
+    objects = ShapeCollection()
+    objects.add_many([SHAPE_CLASSES[kind](*d) for kind, d in _random_shape_dims(object_n)])
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    objects.total_area()
+    query = time.perf_counter() - start
+    print(f"{'ShapeCollection':>28} @ {object_n:>10,}: load {load:6.2f}s, "
+          f"total_area {query:.3f}s ({query / object_n * 1e9:.0f} ns/shape)")
+
+    for use_numpy in (False, True) if np is not None else (False,):
+        columns = ColumnarShapeCollection(use_numpy=use_numpy)
+        adders = {"circle": columns.add_circle, "rectangle": columns.add_rectangle,
+                  "triangle": columns.add_triangle}
+        start = time.perf_counter()
+        for kind, d in _random_shape_dims(n):
+            adders[kind](*d)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        columns.total_area()
+        query = time.perf_counter() - start
+        label = "Columnar (NumPy)" if use_numpy else "Columnar (pure Python)"
+        print(f"{label:>28} @ {n:>10,}: load {load:6.2f}s, "
+              f"total_area {query:.3f}s ({query / n * 1e9:.0f} ns/shape)")
+
+
 if __name__ == "__main__":
     test_circle()
     test_rectangle()
     test_triangle()
     test_comparison()
+    test_immutable_cached()
+    test_slotted_shapes()
     test_collection()
+    test_collection_queries()
+    test_columnar_collection()
     print("\nAll tests passed! ✓")
+
+    print("\nBenchmark: indexed ShapeCollection queries")
+    benchmark_queries()
+
+    print("\nBenchmark: __dict__ vs __slots__ shapes")
+    benchmark_slots()
+
+    print("\nBenchmark: object-based vs columnar collection")
+    benchmark_columnar()
@@ -1,27 +1,200 @@
 """
 Lab 7.1: Configuration Manager — Layered config: defaults → file → env vars.
 TODO: Implement ConfigManager with get/set using dot notation (e.g., 'database.host').
+Going further: flatten the merged layers once so get() is a single dict lookup,
+hot-reload the file by atomically swapping in immutable snapshots, and share one
+read-only default layer between instances instead of deep-copying it per instance.
 """
-import json, os
+import json, os, tempfile, threading, time, tracemalloc
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable
+
+def flatten(config: dict, prefix: str = "") -> dict:
+    # TODO: Return {"app_name": ..., "database": {...}, "database.host": ..., ...}:
+    # every dotted path, including intermediate mappings (so get('database')
+    # still works). Intermediate entries should be the same objects as in
+    # config, not copies. Recurse into any Mapping (plain dicts and
+    # MappingProxyType alike) with prefix=f"{prefix}{key}."
+    pass
+
+def freeze(value):
+    # TODO: Return value with every dict, at any depth, replaced by a
+    # MappingProxyType over a fresh dict of frozen values; anything else as is
+    pass
+
+_DELETED = object()   # tombstone: hides a default key that an override removed
+
+def diff_flat(old, new) -> dict[str, tuple[Any, Any]]:
+    # TODO: Return {key: (old_value, new_value)} for every leaf key that was
+    # added, removed (new_value None) or changed. Skip Mapping values — their
+    # leaves are compared individually. Treat _DELETED like a missing key.
+    pass
 
 class ConfigManager:
+    # Instances share a frozen copy of this and never mutate it — overrides path-copy instead.
     DEFAULT_CONFIG = {"app_name": "MyApp", "debug": False, "database": {"host": "localhost", "port": 5432}}
+    _DEFAULT_TREE: MappingProxyType | None = None    # freeze(DEFAULT_CONFIG), built once per class
+    _DEFAULT_FLAT: MappingProxyType | None = None    # flatten(_DEFAULT_TREE), built once per class
+    # Writers only — get() never takes it. One lock for every instance: writes
+    # are rare and short (reload() parses the file outside it), and a lock per
+    # instance would cost more than the instance's own data.
+    _write_lock = threading.Lock()
+    # Watch/subscribe state stays on the class until an instance first uses it
+    _subscribers: tuple[Callable[[dict], None], ...] = ()
+    _stop: threading.Event | None = None
+    _watcher: threading.Thread | None = None
 
     def __init__(self, config_path="config.json"):
         self.path = Path(config_path)
-        self._config = json.loads(json.dumps(self.DEFAULT_CONFIG))
-        # TODO: Load from file if exists, then apply env overrides
+        self._base = self._defaults()           # shared, read-only default layer
+        self._config, self._layer = self._load()
+
+    @classmethod
+    def _defaults(cls) -> MappingProxyType:
+        # TODO: On first call, cache cls._DEFAULT_TREE = freeze(cls.DEFAULT_CONFIG)
+        # and cls._DEFAULT_FLAT = MappingProxyType(flatten(cls._DEFAULT_TREE));
+        # afterwards just return _DEFAULT_FLAT. Every level must be read-only,
+        # not just the top: get('database') hands out the nested mapping
+        # itself, and if that were a plain dict, get('database')['host'] = 'x'
+        # would silently rewrite the defaults of every instance.
+        pass
+
+    def _load(self) -> tuple[MappingProxyType, MappingProxyType]:
+        # TODO: Start from the shared, frozen _DEFAULT_TREE itself (no copy) and
+        # an empty layer dict. Load from file if exists, then apply env overrides,
+        # each leaf through _assign(). Return (config, MappingProxyType(layer)).
+        # With no file and no env vars, an instance owns nothing but its path,
+        # an empty layer and references to the shared defaults.
+        pass
+
+    @staticmethod
+    def _assign(config: Mapping, layer: dict, key: str, value) -> MappingProxyType:
+        # TODO: Copy-on-write update: copy each mapping along the key's path
+        # with dict(...) (creating missing parents) instead of mutating it, so
+        # the defaults and snapshots readers already hold never change. Store
+        # each copy wrapped in MappingProxyType, and freeze(value), so nothing
+        # get() returns is writable either. Record the changes in layer: the new
+        # key (plus flatten(value, f"{key}.") for a mapping), the copied
+        # parents, and _DELETED for every old key under f"{key}." (check both
+        # layer and the defaults). Return the new root as a MappingProxyType.
+        pass
 
     def get(self, key: str, default=None):
-        # TODO: Support dot notation like 'database.host'
+        # TODO: Support dot notation like 'database.host': look in this
+        # instance's _layer first, then in the shared self._base — at most two
+        # dict lookups, no walking nested dicts per call. A _DELETED hit means
+        # "not set". No lock: reading self._layer once gives a complete
+        # snapshot, old or new, never half of each.
         pass
 
     def set(self, key: str, value):
-        # TODO: Support dot notation
+        # TODO: Support dot notation. Under _write_lock, _assign() into a copy
+        # of the current layer, publish it with a single assignment to
+        # self._layer (and self._config), then _notify the diff.
+        pass
+
+    def on_change(self, callback: Callable[[dict], None]):
+        # TODO: Register callback; it receives diff_flat(old, new) after each change,
+        # where old/new are ChainMap(layer, self._base) views. Under _write_lock,
+        # replace self._subscribers with a new tuple (the class default is an
+        # empty one) so _notify can iterate without a lock.
+        pass
+
+    def _notify(self, diff: dict):
+        # TODO: Call each subscriber with diff (skip if diff is empty)
         pass
 
+    def reload(self) -> dict:
+        # TODO: Parse the file again with _load() *outside* the lock (it's the
+        # slow part), then under _write_lock swap _config and _layer and compute
+        # the diff. Notify subscribers and return the diff. If the file is
+        # mid-write and json raises, keep the current snapshot and re-raise.
+        pass
+
+    def watch(self, interval: float = 1.0) -> threading.Thread:
+        # TODO: Create self._stop = threading.Event() here, not in __init__,
+        # then start a daemon thread (kept in self._watcher) that polls
+        # self.path.stat() every interval seconds (until _stop is set) and
+        # calls reload() whenever (st_mtime_ns, st_size) changes. Record the
+        # starting signature before the thread starts, so a write right after
+        # watch() returns isn't missed. A missing file or a failed reload
+        # should not kill the thread. Return the thread.
+        pass
+
+    def stop(self):
+        # TODO: If watch() was called, set _stop and join the watcher thread
+        pass
+
+def benchmark_startup(n: int = 20_000):
+    """Instances per second and bytes per instance: JSON deep copy vs shared defaults."""
+    class DeepCopyConfig(ConfigManager):
+        """The original approach: every instance deep-copies and flattens the defaults."""
+        def _load(self):
+            config = json.loads(json.dumps(self.DEFAULT_CONFIG))
+            return config, MappingProxyType(flatten(config))
+
+    for cls in (DeepCopyConfig, ConfigManager):
+        cls("does-not-exist.json")   # warm up class-level caches
+        start = time.perf_counter()
+        for _ in range(n):
+            cls("does-not-exist.json")
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [cls("does-not-exist.json") for _ in range(n)]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del instances
+        print(f"  {cls.__name__:>14}: {n / elapsed:>9,.0f} instances/s, "
+              f"{used / n:,.0f} bytes/instance")
+
+def benchmark_get(n: int = 1_000_000):
+    """Compare flat get() against walking the nested dicts on every call."""
+    config = ConfigManager()
+    def walk(key):
+        node = config._config
+        for part in key.split("."):
+            node = node[part]
+        return node
+    for label, lookup in [("nested walk", walk), ("flat get()", config.get)]:
+        start = time.perf_counter()
+        for _ in range(n):
+            lookup("database.host")
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>12}: {elapsed / n * 1e9:6.0f} ns per lookup")
+
+def demo_hot_reload():
+    """Rewrite the config file while a watcher is running and print the diffs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.json"
+        path.write_text(json.dumps({"database": {"host": "db1"}}))
+        config = ConfigManager(path)
+        changed = threading.Event()
+        config.on_change(lambda diff: (print(f"  changed: {diff}"), changed.set()))
+        config.watch(interval=0.05)
+        snapshot = config._layer
+        path.write_text(json.dumps({"database": {"host": "db2", "pool": 10}}))
+        assert changed.wait(timeout=2), "watcher should pick up the change"
+        config.stop()
+        assert config.get("database.host") == "db2"
+        assert snapshot["database.host"] == "db1", "old snapshots must not change"
+
 if __name__ == "__main__":
     config = ConfigManager()
     print(config.get("app_name"))
     print(config.get("database.host"))
+    config.set("database.host", "db.internal")
+    assert config.get("database.host") == "db.internal"
+    assert config.get("database")["host"] == "db.internal"
+    try:
+        ConfigManager("does-not-exist.json").get("database")["host"] = "oops"
+        raise AssertionError("config views must be read-only")
+    except TypeError:
+        pass
+    assert ConfigManager.DEFAULT_CONFIG["database"]["host"] == "localhost"
+    demo_hot_reload()
+    benchmark_startup()
+    benchmark_get()
@@ -7,8 +7,21 @@ Practice reading files, parsing text, and aggregating data.
 """
 
 from pathlib import Path
+from array import array
 from collections import Counter
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Iterator
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
 
 
 SAMPLE_LOG = """\
@@ -30,6 +43,32 @@ SAMPLE_LOG = """\
 """
 
 
+@lru_cache(maxsize=64)
+def _parse_date(date_text: str) -> tuple[int, int, int]:
+    """
+    Turn "YYYY-MM-DD" into (year, month, day).
+
+    Cached: a day's worth of log lines all share one date prefix, so this
+    runs once per distinct date instead of once per line.
+    """
+    # TODO: Implement by slicing — int(date_text[0:4]), ...
+    pass
+
+
+def parse_timestamp(text: str) -> datetime:
+    """
+    Parse a fixed-width "YYYY-MM-DD HH:MM:SS" timestamp.
+
+    Every field sits at a known offset, so slice and int() each one instead
+    of calling the general-purpose datetime.strptime(), which re-interprets
+    the format string on every call. Use _parse_date(text[:10]) for the date.
+
+    Raise ValueError if the text isn't a valid timestamp.
+    """
+    # TODO: Implement
+    pass
+
+
 def parse_log_line(line: str) -> dict | None:
     """
     Parse a single log line into a structured dict.
@@ -43,7 +82,9 @@ def parse_log_line(line: str) -> dict | None:
 
     Return None if the line is empty or can't be parsed.
 
-    Hint: Split carefully — the level is followed by two spaces before the message.
+    Hints:
+    - Split carefully — the level is followed by two spaces before the message.
+    - Use parse_timestamp(line[:19]) for the timestamp.
     """
     # TODO: Implement
     pass
@@ -58,12 +99,30 @@ def parse_log(text: str) -> list[dict]:
     pass
 
 
-def count_by_level(entries: list[dict]) -> dict[str, int]:
+def parse_log_file(path: Path, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """
+    Lazily parse a log file of any size, yielding one entry dict at a time.
+
+    Unlike parse_log(), the whole file is never held in memory: open it with
+    buffering=chunk_size so reads happen in large blocks, then iterate the
+    file object line by line. Skip empty and unparseable lines.
+
+    Because this is a generator, callers can stop early, or feed it straight
+    into an aggregation like count_by_level() without building a list.
+    """
+    # TODO: Implement using parse_log_line
+    pass
+
+
+def count_by_level(entries: "Iterable[dict] | LogSummary") -> dict[str, int]:
     """
     Count log entries by level.
 
     Return a dict like {"INFO": 9, "WARNING": 3, "ERROR": 3}
 
+    entries may also be a LogSummary (see parse_log_parallel), which
+    already holds the counts.
+
     Hint: Use collections.Counter.
     """
     # TODO: Implement
@@ -78,19 +137,87 @@ def filter_by_level(entries: list[dict], level: str) -> list[dict]:
     pass
 
 
-def errors_between(entries: list[dict], start: str, end: str) -> list[dict]:
+def errors_between(entries: list[dict], start: str | datetime, end: str | datetime) -> list[dict]:
     """
     Return ERROR entries between start and end times (inclusive).
 
-    start and end are strings like "08:30:00" (time only, same date assumed).
+    start and end are either strings like "08:30:00" (time only, same date
+    assumed) or datetime objects, which are compared in full — so a range
+    can span several days.
 
-    Hint: Compare datetime.time() objects.
+    Hint: Compare datetime.time() objects for strings, whole datetimes otherwise.
+    For many queries over the same entries, build a LogIndex instead.
     """
     # TODO: Implement
     pass
 
 
-def write_report(entries: list[dict], output_path: Path) -> None:
+class LogIndex:
+    """
+    A time-sorted index of log entries, built once and queried many times.
+
+    For each level, keep two parallel lists sorted by time: the timestamps
+    (the bisect key) and the entries themselves. A range query is then two
+    binary searches plus a slice — O(log n + k) — instead of a scan over
+    every entry.
+
+    Example:
+        index = LogIndex(parse_log(SAMPLE_LOG))
+        index.between("ERROR", datetime(2024, 1, 15, 8, 30), datetime(2024, 1, 15, 9, 30))
+        → the 2 ERROR entries in that window
+    """
+
+    def __init__(self, entries: Iterable[dict]):
+        self._timestamps: dict[str, list[datetime]] = {}
+        self._entries: dict[str, list[dict]] = {}
+        # TODO: Group entries by level, sort each group by timestamp (a
+        # stable sort keeps same-second entries in file order), and fill both dicts
+        pass
+
+    def levels(self) -> list[str]:
+        """Return the levels present, sorted."""
+        # TODO: Implement
+        pass
+
+    def by_level(self, level: str) -> list[dict]:
+        """Return all entries of a level in time order (empty list if none)."""
+        # TODO: Implement
+        pass
+
+    def between(self, level: str, start: datetime, end: datetime) -> list[dict]:
+        """
+        Return entries of a level with start <= timestamp <= end, in time order.
+
+        Hint: bisect.bisect_left(timestamps, start) and
+        bisect.bisect_right(timestamps, end) are the slice boundaries.
+        """
+        # TODO: Implement
+        pass
+
+    def save(self, path: Path) -> None:
+        """
+        Write the index to disk as JSON so later runs can skip parsing.
+
+        Format: {"version": 1, "levels": {level: [[timestamp, message], ...]}}
+        with timestamps as "YYYY-MM-DD HH:MM:SS" strings, already in sorted order.
+        """
+        # TODO: Implement
+        pass
+
+    @classmethod
+    def load(cls, path: Path) -> "LogIndex":
+        """
+        Read an index written by save().
+
+        The lists on disk are already sorted, so fill the dicts directly
+        (cls.__new__(cls) skips __init__) rather than re-sorting. Raise
+        ValueError for an unknown version.
+        """
+        # TODO: Implement — parse timestamps with parse_timestamp()
+        pass
+
+
+def write_report(entries: "list[dict] | LogSummary", output_path: Path) -> None:
     """
     Write a summary report to a file.
 
@@ -100,12 +227,330 @@ def write_report(entries: list[dict], output_path: Path) -> None:
     - List of all ERROR messages with timestamps
     - Time range (first to last entry)
 
+    entries may also be a LogSummary. Hint: turn a list into one with
+    LogSummary.from_entries() first, then write every report from a summary.
+
     Use pathlib and the 'with' statement.
     """
     # TODO: Implement
     pass
 
 
+# ============================================================
+# Going Further: Parallel Parsing
+# ============================================================
+#
+# Parsing is CPU-bound, so threads won't help (the GIL) — processes will.
+# Each worker parses its own byte range of the file and sends back a small
+# LogSummary rather than every parsed entry: pickling a million dicts back
+# to the parent would cost more than parsing them.
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(ts: datetime) -> int:
+    """Whole seconds since 1970-01-01 (timestamps are treated as UTC)."""
+    return int((ts - EPOCH).total_seconds())
+
+
+def from_epoch(seconds: int) -> datetime:
+    """Inverse of to_epoch()."""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@dataclass
+class LogSummary:
+    """
+    Compact, mergeable aggregate of a run of log entries.
+
+    error_times and error_messages are parallel: error_times[i] is the epoch
+    second of error_messages[i]. first/last are epoch seconds, or None when
+    the summary is empty.
+    """
+    counts: Counter = field(default_factory=Counter)
+    first: int | None = None
+    last: int | None = None
+    error_times: array = field(default_factory=lambda: array("q"))
+    error_messages: list[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "LogSummary":
+        """Build a summary from parsed entries (a list or a generator)."""
+        # TODO: Implement
+        pass
+
+    def to_dict(self) -> dict:
+        """
+        Return a JSON-serializable dict of every field (counts as a plain
+        dict, error_times as a list), for persisting between runs.
+        """
+        # TODO: Implement
+        pass
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogSummary":
+        """Inverse of to_dict()."""
+        # TODO: Implement
+        pass
+
+    def merge(self, other: "LogSummary") -> "LogSummary":
+        """
+        Combine with a summary of the entries that come *after* this one and
+        return the result. Counts add, first comes from self (if set), last
+        from other (if set), and the error arrays are concatenated in order.
+        """
+        # TODO: Implement
+        pass
+
+
+def split_ranges(path: Path, num_chunks: int) -> list[tuple[int, int]]:
+    """
+    Split a file into num_chunks (start, end) byte ranges that begin and end
+    on line boundaries, together covering the whole file.
+
+    Hint: aim for size // num_chunks per chunk. For each tentative boundary,
+    f.seek() there (in binary mode), f.readline() to skip the rest of that
+    line, and use f.tell() as the real boundary. Drop empty ranges.
+    """
+    # TODO: Implement
+    pass
+
+
+def _parse_range(args: tuple[str, int, int]) -> LogSummary:
+    """
+    Worker: parse the lines in bytes [start, end) of a file into a LogSummary.
+
+    Read the range in binary (f.seek(start); f.read(end - start)), decode
+    it, and feed the lines through parse_log_line().
+    """
+    # TODO: Implement
+    pass
+
+
+def parse_log_parallel(path: Path, workers: int | None = None) -> LogSummary:
+    """
+    Parse a log file across a process pool and return one merged LogSummary.
+
+    Split the file with split_ranges(path, workers * 4) — a few chunks per
+    worker evens out the load — map _parse_range over them with a
+    ProcessPoolExecutor(workers), and merge the partial summaries *in file
+    order* (executor.map preserves it). workers=None means os.cpu_count().
+    """
+    # TODO: Implement
+    pass
+
+
+# ============================================================
+# Going Further: Incremental Updates
+# ============================================================
+#
+# A log file only ever grows (until it's rotated), so a report that already
+# covered the first N bytes only needs to parse what came after them. The
+# checkpoint itself must stay small too: counts, first/last and offsets are
+# rewritten each run, but error messages are only ever appended to a second
+# file — re-serializing every error seen so far would cost O(total errors)
+# per update, not O(new data).
+
+def errors_path(state_path: Path) -> Path:
+    """The append-only file next to state_path that holds every error seen."""
+    return state_path.with_name(state_path.name + ".errors")
+
+
+def load_checkpoint(state_path: Path) -> dict | None:
+    """
+    Read the checkpoint written by save_checkpoint(), or return None if it
+    doesn't exist yet.
+
+    Return {"inode": int, "offset": int, "errors_size": int,
+    "summary": LogSummary} — a summary of counts, first and last only; its
+    error arrays stay empty (the errors live in errors_path(state_path)).
+    """
+    # TODO: Implement
+    pass
+
+
+def save_checkpoint(state_path: Path, inode: int, offset: int, summary: LogSummary,
+                    errors_size: int) -> None:
+    """
+    Persist the checkpoint as JSON: {"inode", "offset", "errors_size",
+    "counts", "first", "last"} — never the error messages.
+
+    Write to a temporary file next to state_path and os.replace() it into
+    place, so a crash mid-write never leaves a half-written checkpoint.
+    """
+    # TODO: Implement
+    pass
+
+
+def append_errors(state_path: Path, summary: LogSummary, size: int) -> int:
+    """
+    Append summary's errors to errors_path(state_path) and return its new size.
+
+    Open it with "ab", truncate() it to size first — the size the last
+    checkpoint recorded, so errors a crashed run appended without saving
+    its checkpoint aren't counted twice — then write one
+    f"{time}\t{message}\n" line per error. Cost: O(new errors).
+    """
+    # TODO: Implement
+    pass
+
+
+def load_errors(state_path: Path) -> tuple[array, list[str]]:
+    """
+    Read every error recorded for state_path's log: (error_times, error_messages).
+
+    Only read the first errors_size bytes the checkpoint vouches for. This is
+    the O(total errors) step, so do it only when a full report needs it.
+    """
+    # TODO: Implement
+    pass
+
+
+def update_summary(log_path: Path, state_path: Path) -> LogSummary:
+    """
+    Bring the persisted summary of log_path up to date and return it.
+
+    1. Load the checkpoint and os.stat() the log.
+    2. Start over from offset 0 (and errors_size 0) with an empty LogSummary
+       if there's no checkpoint, the inode differs (the log was rotated), or
+       the file is now smaller than the offset (it was truncated).
+    3. Parse only bytes [offset, end) with _parse_range(), where end is just
+       past the last newline — a half-written last line waits for next run.
+    4. append_errors() the new part's errors, merge the new part into the
+       old summary, save the checkpoint with the new offset and errors size,
+       and return the merged summary.
+
+    counts, first and last of the result cover the whole log; its error
+    arrays hold only the errors found in this run (load_errors() has them
+    all). The cost is proportional to the appended data, not to the file
+    size or to how many errors came before.
+    """
+    # TODO: Implement
+    pass
+
+
+# ============================================================
+# Going Further: Columnar Binary Cache
+# ============================================================
+#
+# Re-parsing an old log that hasn't changed is wasted work. Instead, save the
+# parsed entries next to it in a binary "sidecar" file laid out column by
+# column, and map that file straight into memory on later runs.
+#
+# Cache layout (all integers little-endian):
+#
+#   header      CACHE_HEADER: magic, version, source size, source mtime_ns,
+#               entry count n, message blob length
+#   timestamps  n × int64   epoch seconds (to_epoch)
+#   levels      n × int8    index into LEVELS, zero-padded to a multiple of 8
+#   offsets     (n + 1) × int64   message i is blob[offsets[i]:offsets[i + 1]]
+#   blob        UTF-8 messages, back to back
+
+LEVELS = ("INFO", "WARNING", "ERROR")
+CACHE_MAGIC = b"LOGC"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sIQQQQ")
+
+
+class CachedLog:
+    """
+    Read-only, sequence-like view of a cache file.
+
+    The file is mmap'd and each column is exposed as a memoryview cast to
+    its item type ("q" or "b"), so opening the cache copies nothing — an
+    entry dict is only built when you index or iterate.
+
+    Use as a context manager (or call close()) to release the mapping.
+    """
+
+    def __init__(self, cache_path: Path):
+        # TODO: Open the file, mmap it read-only (mmap.ACCESS_READ), unpack
+        # CACHE_HEADER from the start, and slice memoryview(self._mm) into the
+        # four sections (.cast("q") / .cast("b") for the numeric ones).
+        # Validate before slicing, raising ValueError (and closing what you
+        # opened) if the file is shorter than CACHE_HEADER.size, the magic or
+        # version doesn't match, or the file length isn't exactly the header
+        # plus the section sizes it declares — otherwise a truncated or corrupt
+        # cache escapes as struct.error or a TypeError from cast().
+        # (mmap itself raises ValueError for an empty file.)
+        pass
+
+    @property
+    def source_size(self) -> int:
+        # TODO: Implement — from the header
+        pass
+
+    @property
+    def source_mtime_ns(self) -> int:
+        # TODO: Implement — from the header
+        pass
+
+    def __len__(self) -> int:
+        # TODO: Implement
+        pass
+
+    def __getitem__(self, i: int) -> dict:
+        # TODO: Build {"timestamp": from_epoch(...), "level": LEVELS[...],
+        # "message": bytes(blob slice).decode()} for entry i (support negative i)
+        pass
+
+    def __iter__(self) -> Iterator[dict]:
+        # TODO: Implement
+        pass
+
+    def close(self) -> None:
+        # TODO: Release every memoryview before closing the mmap — mmap.close()
+        # raises BufferError while views of it still exist
+        pass
+
+    def __enter__(self) -> "CachedLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_log_cache(entries: Iterable[dict], source: Path, cache_path: Path) -> None:
+    """
+    Write entries parsed from source to cache_path in the layout above.
+
+    Build each column as an array ("q" for timestamps/offsets, "b" for
+    levels) and the blob as a bytearray, then write the header (with
+    source's current st_size and st_mtime_ns) followed by each column's
+    tobytes(). Write to a temporary file and os.replace() it into place.
+    """
+    # TODO: Implement
+    pass
+
+
+def open_log_cache(source: Path, cache_path: Path | None = None) -> CachedLog | None:
+    """
+    Return a CachedLog for source if a valid, up-to-date cache exists.
+
+    cache_path defaults to source with ".cache" appended to its name.
+    Return None if the cache is missing, unreadable (ValueError), or its
+    recorded size/mtime_ns don't match source's current os.stat() — the log
+    changed since the cache was written.
+    """
+    # TODO: Implement
+    pass
+
+
+def parse_log_cached(source: Path, cache_path: Path | None = None) -> "CachedLog | list[dict]":
+    """
+    Parse source, reusing (or creating) its sidecar cache.
+
+    If open_log_cache() finds a valid cache, return that CachedLog. Otherwise
+    parse with parse_log_file(), write the cache, and return the entry list.
+    """
+    # TODO: Implement
+    pass
+
+
 # ============================================================
 # Tests
 # ============================================================
@@ -120,12 +565,34 @@ def test_parse_line():
     print("✓ parse_log_line passed")
 
 
+def test_parse_timestamp():
+    ts = parse_timestamp("2024-01-15 08:23:01")
+    assert ts == datetime(2024, 1, 15, 8, 23, 1)
+    assert parse_timestamp("2024-01-15 23:59:59") == datetime(2024, 1, 15, 23, 59, 59)
+    try:
+        parse_timestamp("2024-13-45 08:23:01")
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+    print("✓ parse_timestamp passed")
+
+
 def test_parse_log():
     entries = parse_log(SAMPLE_LOG)
     assert len(entries) == 15
     print("✓ parse_log passed")
 
 
+def test_parse_log_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "app.log"
+        path.write_text(SAMPLE_LOG + "\nnot a log line\n")
+        entries = parse_log_file(path, chunk_size=64)
+        assert not isinstance(entries, list), "parse_log_file should be lazy"
+        assert list(entries) == parse_log(SAMPLE_LOG)
+    print("✓ parse_log_file passed")
+
+
 def test_count_by_level():
     entries = parse_log(SAMPLE_LOG)
     counts = count_by_level(entries)
@@ -150,6 +617,125 @@ def test_errors_between():
     print("✓ errors_between passed")
 
 
+def test_errors_between_datetimes():
+    two_days = parse_log(SAMPLE_LOG + SAMPLE_LOG.replace("2024-01-15", "2024-01-16"))
+    errors = errors_between(two_days, datetime(2024, 1, 15, 9, 0), datetime(2024, 1, 16, 8, 30))
+    assert [e["timestamp"] for e in errors] == [datetime(2024, 1, 15, 9, 15, 44),
+                                                datetime(2024, 1, 16, 8, 25, 30)]
+    print("✓ errors_between with datetimes passed")
+
+
+def test_log_index():
+    # Feed the days out of order: the index must sort them
+    entries = parse_log(SAMPLE_LOG.replace("2024-01-15", "2024-01-16") + SAMPLE_LOG)
+    index = LogIndex(entries)
+    assert index.levels() == ["ERROR", "INFO", "WARNING"]
+    assert len(index.by_level("INFO")) == 18
+    assert index.by_level("DEBUG") == []
+
+    window = index.between("ERROR", datetime(2024, 1, 15, 8, 30), datetime(2024, 1, 15, 9, 30))
+    assert [e["message"] for e in window] == ["database connection lost", "disk space low: 5% remaining"]
+    across = index.between("ERROR", datetime(2024, 1, 15, 9, 0), datetime(2024, 1, 16, 8, 30))
+    assert len(across) == 2
+    assert index.between("ERROR", datetime(2025, 1, 1), datetime(2025, 1, 2)) == []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.json"
+        index.save(path)
+        loaded = LogIndex.load(path)
+    for level in index.levels():
+        assert loaded.by_level(level) == index.by_level(level)
+    print("✓ LogIndex passed")
+
+
+def test_split_ranges():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "app.log"
+        path.write_text(SAMPLE_LOG)
+        data = path.read_bytes()
+        for num_chunks in (1, 3, 7, 100):
+            ranges = split_ranges(path, num_chunks)
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+            assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])), "Ranges must be contiguous"
+            assert all(data[end - 1:end] == b"\n" for _, end in ranges), "Ranges must end on a newline"
+    print("✓ split_ranges passed")
+
+
+def test_parse_log_parallel():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "app.log"
+        path.write_text(SAMPLE_LOG * 20)
+        summary = parse_log_parallel(path, workers=2)
+        expected = LogSummary.from_entries(parse_log(SAMPLE_LOG * 20))
+        assert summary == expected
+        assert summary.total == 300
+        assert count_by_level(summary) == {"INFO": 180, "WARNING": 60, "ERROR": 60}
+        assert from_epoch(summary.first) == datetime(2024, 1, 15, 8, 23, 1)
+
+        report = Path(tmp) / "report.txt"
+        write_report(summary, report)
+        assert "Total entries: 300" in report.read_text()
+    print("✓ parse_log_parallel passed")
+
+
+def test_update_summary():
+    with tempfile.TemporaryDirectory() as tmp:
+        log, state = Path(tmp) / "app.log", Path(tmp) / "app.log.state"
+        log.write_text(SAMPLE_LOG)
+        assert update_summary(log, state).total == 15
+        assert update_summary(log, state).total == 15      # nothing new
+
+        with log.open("a") as f:
+            f.write(SAMPLE_LOG.splitlines()[3] + "\n")      # one more ERROR
+            f.write("2024-01-15 10:10:00 INFO  half a li")    # no newline yet
+        summary = update_summary(log, state)
+        assert summary.total == 16 and summary.counts["ERROR"] == 4
+        assert len(summary.error_messages) == 1, "only this run's errors are returned"
+        with log.open("a") as f:
+            f.write("ne\n")
+        assert update_summary(log, state).total == 17
+
+        error_times, error_messages = load_errors(state)
+        assert len(error_times) == len(error_messages) == 4
+        assert "error_messages" not in state.read_text(), "errors belong in errors_path(state)"
+
+        # Rotation: a brand-new file (new inode) takes the old one's name
+        rotated = Path(tmp) / "app.log.new"
+        rotated.write_text(SAMPLE_LOG.splitlines()[0] + "\n")
+        os.replace(rotated, log)
+        assert update_summary(log, state).total == 1
+        assert load_errors(state) == (array("q"), [])
+    print("✓ update_summary passed")
+
+
+def test_log_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "app.log"
+        log.write_text(SAMPLE_LOG + "2024-01-15 10:06:00 ERROR  ünïcödé message ✓\n")
+        expected = parse_log(log.read_text())
+
+        assert open_log_cache(log) is None              # no cache yet
+        first = parse_log_cached(log)
+        assert list(first) == expected
+        with open_log_cache(log) as cached:            # written by the first call
+            assert isinstance(cached, CachedLog)
+            assert len(cached) == 16
+            assert list(cached) == expected
+            assert cached[-1]["message"] == "ünïcödé message ✓"
+            assert cached.source_size == log.stat().st_size
+
+        with log.open("a") as f:                        # source changed → cache is stale
+            f.write(SAMPLE_LOG.splitlines()[0] + "\n")
+        assert open_log_cache(log) is None
+        assert len(parse_log_cached(log)) == 17
+
+        cache = log.with_name(log.name + ".cache")       # corrupt caches are ignored, not fatal
+        for damaged in (b"", cache.read_bytes()[:10], cache.read_bytes()[:-3]):
+            cache.write_bytes(damaged)
+            assert open_log_cache(log) is None
+    print("✓ log cache passed")
+
+
 def test_write_report(tmp_path=None):
     entries = parse_log(SAMPLE_LOG)
     output = Path("/tmp/test_log_report.txt")
@@ -162,11 +748,84 @@ def test_write_report(tmp_path=None):
     print("✓ write_report passed")
 
 
+# ============================================================
+# Benchmark
+# ============================================================
+
+def _write_big_log(path: Path, num_lines: int) -> None:
+    """Write num_lines log lines by repeating SAMPLE_LOG across several days."""
+    sample = SAMPLE_LOG.splitlines()
+    with path.open("w") as f:
+        for i in range(num_lines):
+            day = 1 + (i // 100_000) % 28
+            f.write(f"2024-01-{day:02d}{sample[i % len(sample)][10:]}\n")
+
+
+def benchmark_parse(num_lines: int = 1_000_000):
+    """Report lines/sec and peak memory: parse_log(read_text()) vs parse_log_file()."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big.log"
+        _write_big_log(path, num_lines)
+        size_mb = path.stat().st_size / 1e6
+
+        runs = {
+            "parse_log(text)": lambda: len(parse_log(path.read_text())),
+            "parse_log_file(path)": lambda: sum(1 for _ in parse_log_file(path)),
+        }
+        for label, run in runs.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert count == num_lines
+            print(f"  {label:>22}: {count / elapsed:>10,.0f} lines/s "
+                  f"({size_mb:.0f} MB file), peak memory {peak / 1e6:,.1f} MB")
+
+
+def benchmark_parallel(num_lines: int = 2_000_000, max_workers: int | None = None):
+    """Report parse_log_parallel throughput from 1 worker up to max_workers (default: all cores)."""
+    max_workers = max_workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big.log"
+        _write_big_log(path, num_lines)
+        worker_counts = [1]
+        while worker_counts[-1] * 2 < max_workers:
+            worker_counts.append(worker_counts[-1] * 2)
+        if max_workers > 1:
+            worker_counts.append(max_workers)
+
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            summary = parse_log_parallel(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert summary.total == num_lines
+            baseline = baseline or elapsed
+            print(f"  {workers:>3} worker(s): {num_lines / elapsed:>12,.0f} lines/s "
+                  f"({baseline / elapsed:.1f}x)")
+
+
 if __name__ == "__main__":
+    test_parse_timestamp()
     test_parse_line()
     test_parse_log()
+    test_parse_log_file()
     test_count_by_level()
     test_filter()
     test_errors_between()
+    test_errors_between_datetimes()
+    test_log_index()
     test_write_report()
+    test_split_ranges()
+    test_parse_log_parallel()
+    test_update_summary()
+    test_log_cache()
     print("\nAll tests passed! ✓")
+
+    print("\nBenchmark: in-memory vs streaming parse")
+    benchmark_parse()
+
+    print("\nBenchmark: parallel parsing, 1 to N cores")
+    benchmark_parallel()
@@ -7,6 +7,17 @@ Practice creating exception hierarchies, adding context, and
 converting exceptions to API-friendly error responses.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, NamedTuple, Protocol
+import hashlib
+import json
+import math
+import multiprocessing
+import struct
+import threading
+import time
+
 
 # ============================================================
 # Part 1: Define the Exception Hierarchy
@@ -79,7 +90,207 @@ class RateLimitError(APIError):
 
 
 # ============================================================
-# Part 2: Use the Exceptions in a Mock API
+# Part 2: A Token-Bucket Rate Limiter
+# ============================================================
+
+class RateLimiter(Protocol):
+    """What get_user needs from a limiter backend; every limiter below fits."""
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take cost tokens for key: 0.0 if allowed, else seconds to wait."""
+        ...
+
+    def clear(self) -> None:
+        """Forget every key."""
+        ...
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: each key can burst up to `capacity` requests and
+    earns tokens back at capacity / per tokens per second.
+
+    Buckets are refilled lazily — on each acquire(), from the time elapsed
+    on a monotonic clock — so idle keys cost nothing. A bucket that has
+    refilled completely is indistinguishable from a brand-new one, so such
+    idle keys can be evicted without changing behaviour; memory is bounded
+    by the number of *recently active* keys, not every key ever seen.
+
+    Safe to share between threads. Any RateLimiter can stand in for it
+    (see get_user's limiter argument).
+    """
+
+    def __init__(self, capacity: float, per: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.per = per
+        self.rate = capacity / per                  # tokens per second
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: dict[str, list[float]] = {}  # key -> [tokens, last refill time]
+        self._next_sweep = clock() + per
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Try to take `cost` tokens from key's bucket.
+
+        Return 0.0 if the request is allowed, otherwise the number of
+        seconds until enough tokens will have accumulated (the retry_after).
+        """
+        # TODO: Under self._lock: read now = self._clock(); a missing key
+        # starts with a full bucket. Refill: tokens = min(capacity,
+        # tokens + (now - last) * rate), then store (tokens, now). If
+        # tokens >= cost, subtract cost and return 0.0; otherwise return
+        # (cost - tokens) / rate without taking anything. Call
+        # _evict_idle(now) once now passes self._next_sweep.
+        pass
+
+    def _evict_idle(self, now: float) -> None:
+        # TODO: Drop every bucket that would be full by now (tokens +
+        # (now - last) * rate >= capacity), then set _next_sweep = now + per.
+        # Sweeping at most once per `per` seconds keeps acquire() O(1) amortized.
+        pass
+
+    def clear(self) -> None:
+        """Forget every key (all buckets full again)."""
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ShardedTokenBucketLimiter:
+    """
+    The same limiter split into `shards` independent TokenBucketLimiters
+    (lock striping), each owning the keys whose hash lands on it.
+
+    Requests for different keys mostly take different locks, so threads
+    rarely wait for each other; each shard also sweeps only its own keys.
+    """
+
+    def __init__(self, capacity: float, per: float = 60.0, shards: int = 16,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.per = per
+        self._shards = [TokenBucketLimiter(capacity, per, clock) for _ in range(shards)]
+
+    def shard_for(self, key: str) -> TokenBucketLimiter:
+        # TODO: Pick a shard with hash(key) % len(self._shards) — stable for
+        # the life of the process, which is all in-memory state needs
+        pass
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        # TODO: Delegate to the key's shard
+        pass
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class SharedMemoryLimiter:
+    """
+    A token-bucket limiter whose state lives in one shared_memory block, so
+    every worker process on the host draws from the same budget.
+
+    The block is a fixed-size open-addressing table of SLOT records
+    (key hash, tokens, last refill time). Keys are hashed with blake2b, not
+    hash(), because hash() of a str differs between processes. Timestamps
+    come from time.monotonic(), which on Linux is one clock for the whole
+    machine. A multiprocessing.Lock guards the table.
+
+    Hand the limiter to workers through a pool initializer (see
+    _attach_limiter); the creating process calls unlink() when done.
+    """
+
+    SLOT = struct.Struct("<qdd")     # key hash (0 = empty), tokens, last refill
+
+    def __init__(self, capacity: float, per: float = 60.0, slots: int = 4096,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.per = per
+        self.rate = capacity / per
+        self.slots = slots
+        self._clock = clock
+        self._lock = multiprocessing.Lock()
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * self.SLOT.size)
+        self._shm.buf[:] = bytes(self._shm.size)   # all slots empty
+        self.name = self._shm.name
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        """Stable, non-zero 63-bit hash of key."""
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return (int.from_bytes(digest, "little") >> 1) or 1
+
+    def _find_slot(self, h: int, now: float) -> int:
+        # TODO: Linear probing from h % slots, at most `slots` steps. Return
+        # the index holding h if there is one. Otherwise the key needs a slot:
+        # use the first *stale* slot passed on the way (its bucket would be
+        # full by now, so forgetting it changes nothing — and since it isn't
+        # empty, probe chains through it stay intact), else the empty slot
+        # that ended the probe. Raise RuntimeError if the table is full.
+        # Read records with self.SLOT.unpack_from(self._shm.buf, i * self.SLOT.size).
+        pass
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        # TODO: Same contract and refill rule as TokenBucketLimiter.acquire().
+        # Under self._lock: find the slot for self._hash(key); a new key (or a
+        # reused stale slot) starts full; write back with self.SLOT.pack_into.
+        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shm.buf[:] = bytes(self._shm.size)
+
+    def __len__(self) -> int:
+        return sum(1 for h, _, _ in self.SLOT.iter_unpack(self._shm.buf[: self.slots * self.SLOT.size]) if h)
+
+    def __getstate__(self) -> dict:
+        # The lock only pickles while a pool is starting its workers, which
+        # is exactly when this is sent. Workers always use time.monotonic.
+        state = self.__dict__.copy()
+        del state["_shm"], state["_clock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._clock = time.monotonic
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, track=False)   # 3.13+
+        except TypeError:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+
+    def close(self) -> None:
+        """Detach this process from the block."""
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the block (creator only, once every process is done with it)."""
+        self._shm.close()
+        self._shm.unlink()
+
+
+_worker_limiter: SharedMemoryLimiter | None = None
+
+
+def _attach_limiter(limiter: SharedMemoryLimiter) -> None:
+    """Pool initializer: keep the shared limiter for this worker process."""
+    global _worker_limiter
+    _worker_limiter = limiter
+
+
+def _hammer(key: str, n: int) -> int:
+    """Worker task: try n requests for key, return how many were allowed."""
+    return sum(_worker_limiter.acquire(key) == 0.0 for _ in range(n))
+
+
+# ============================================================
+# Part 3: Use the Exceptions in a Mock API
 # ============================================================
 
 USERS_DB = {
@@ -87,17 +298,20 @@ USERS_DB = {
     2: {"id": 2, "name": "Bob", "email": "bob@example.com"},
 }
 
-REQUEST_COUNTS = {}
 RATE_LIMIT = 5
+RATE_LIMITER = ShardedTokenBucketLimiter(capacity=RATE_LIMIT, per=60.0, shards=16)
 
 
-def get_user(user_id: int, api_key: str | None = None) -> dict:
+def get_user(user_id: int, api_key: str | None = None,
+             limiter: RateLimiter | None = None) -> dict:
     """
     Simulate fetching a user from the API.
 
     Rules:
     1. If api_key is None, raise AuthenticationError
-    2. Track requests per api_key; if > RATE_LIMIT, raise RateLimitError(retry_after=60)
+    2. Ask limiter (RATE_LIMITER if it is None — test with `is None`, since a
+       limiter tracking no keys has len() 0 and is falsy) to acquire(api_key);
+       if it returns a wait > 0, raise RateLimitError(retry_after=math.ceil(wait))
     3. If user_id is not a positive integer, raise ValidationError for field "user_id"
     4. If user_id not in USERS_DB, raise NotFoundError
     5. Otherwise, return the user dict
@@ -120,6 +334,73 @@ def handle_request(func, *args, **kwargs) -> dict:
     pass
 
 
+# ============================================================
+# Going Further: A Fast Path for Expected Errors
+# ============================================================
+#
+# Raising is cheap in Python, but building an exception, formatting its message
+# and calling to_dict() for every rejected request is not. When most traffic is
+# rejected (a flood of unauthenticated or rate-limited calls), that work
+# dominates. Expected failures can instead be *returned* as one of a few
+# preallocated, read-only payloads; exceptions stay for the unexpected.
+
+class FrozenDict(dict):
+    """
+    A dict that refuses changes after construction.
+
+    Safe to share between requests, and — unlike a MappingProxyType —
+    still a real dict, so json.dumps() and web frameworks serialize it
+    exactly like the plain dicts handle_request returns.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def _frozen(error_code: str, message: str, status: int) -> FrozenDict:
+    return FrozenDict(error=error_code, message=message, status=status)
+
+
+class Err(NamedTuple):
+    """An expected failure returned instead of raised; response is shared and immutable."""
+    response: FrozenDict
+
+
+ERR_AUTH_REQUIRED = Err(_frozen("AUTH_FAILED", "API key required", 401))
+ERR_RATE_LIMITED = Err(_frozen("RATE_LIMITED", "Rate limit exceeded", 429))
+ERR_INVALID_USER_ID = Err(_frozen("VALIDATION_ERROR", "user_id must be a positive integer", 400))
+ERR_USER_NOT_FOUND = Err(_frozen("NOT_FOUND", "User not found", 404))
+
+
+def get_user_fast(user_id: int, api_key: str | None = None,
+                  limiter: RateLimiter | None = None) -> dict | Err:
+    """
+    Same rules (and the same RATE_LIMITER) as get_user, but expected
+    failures return one of the preallocated ERR_* values instead of raising.
+    """
+    # TODO: Implement — no exception objects, no string formatting on the error path
+    pass
+
+
+def handle_request_fast(func, *args, **kwargs) -> dict:
+    """
+    Like handle_request, for functions that may return an Err.
+
+    An Err result returns its shared response as is (no allocation); any
+    other result is wrapped in {"status": 200, "data": result}. Raised
+    APIErrors and other exceptions are still handled as in handle_request.
+    """
+    # TODO: Implement
+    pass
+
+
 # ============================================================
 # Tests
 # ============================================================
@@ -158,7 +439,7 @@ def test_rate_limit():
 
 def test_get_user():
     # Reset state
-    REQUEST_COUNTS.clear()
+    RATE_LIMITER.clear()
 
     # No API key
     result = handle_request(get_user, 1)
@@ -181,7 +462,7 @@ def test_get_user():
 
 
 def test_rate_limiting():
-    REQUEST_COUNTS.clear()
+    RATE_LIMITER.clear()
     for i in range(RATE_LIMIT):
         result = handle_request(get_user, 1, api_key="flood_key")
         assert result["status"] == 200, f"Request {i+1} should succeed"
@@ -191,6 +472,234 @@ def test_rate_limiting():
     print("✓ Rate limiting works")
 
 
+def test_handle_request_fast():
+    RATE_LIMITER.clear()
+    cases = [(1, False), (1, True), (999, True), (-1, True), ("1", True)]
+    for user_id, with_key in cases:
+        slow = handle_request(get_user, user_id, api_key="slow_key" if with_key else None)
+        fast = handle_request_fast(get_user_fast, user_id, api_key="fast_key" if with_key else None)
+        assert fast["status"] == slow["status"], (user_id, fast, slow)
+    assert handle_request_fast(get_user_fast, 1, api_key="fast_key")["data"]["name"] == "Alice"
+
+    # Error payloads are shared and read-only, but serialize like any response
+    first = handle_request_fast(get_user_fast, 1)
+    assert first is handle_request_fast(get_user_fast, 1) is ERR_AUTH_REQUIRED.response
+    for mutate in (lambda: first.__setitem__("status", 200), lambda: first.update(status=200),
+                   lambda: first.pop("status")):
+        try:
+            mutate()
+            assert False, "error payloads must be immutable"
+        except TypeError:
+            pass
+    assert json.loads(json.dumps(first)) == dict(first)
+
+    # Unexpected exceptions still become 500s
+    def broken():
+        raise KeyError("boom")
+    assert handle_request_fast(broken)["status"] == 500
+
+    # Rate limiting is shared with get_user
+    RATE_LIMITER.clear()
+    for _ in range(RATE_LIMIT):
+        assert handle_request_fast(get_user_fast, 1, api_key="fast_flood")["status"] == 200
+    assert handle_request_fast(get_user_fast, 1, api_key="fast_flood") is ERR_RATE_LIMITED.response
+    print("✓ handle_request_fast works")
+
+
+def _allowed_under_contention(limiter: RateLimiter, threads: int = 8, calls: int = 500) -> int:
+    """Hit one key from several threads at once; return how many requests got through."""
+    allowed = []
+    def hammer():
+        allowed.append(sum(limiter.acquire("shared") == 0.0 for _ in range(calls)))
+    workers = [threading.Thread(target=hammer) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sum(allowed)
+
+
+def test_token_bucket():
+    now = [0.0]
+    limiter = TokenBucketLimiter(capacity=3, per=3.0, clock=lambda: now[0])   # 1 token/second
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == 1.0           # empty: next token in 1s
+    assert limiter.acquire("b") == 0.0           # keys are independent
+    now[0] = 0.25
+    assert limiter.acquire("a") == 0.75          # retry_after shrinks as time passes
+    now[0] = 1.0
+    assert limiter.acquire("a") == 0.0           # refilled lazily
+    assert limiter.acquire("a") == 1.0
+
+    # Idle keys are evicted once their buckets would be full again
+    for i in range(1000):
+        limiter.acquire(f"burst-{i}")
+    assert len(limiter) == 1002
+    now[0] = 10.0
+    limiter.acquire("a")
+    assert len(limiter) == 1
+
+    # Thread-safe: exactly `capacity` of many concurrent requests get through
+    assert _allowed_under_contention(TokenBucketLimiter(capacity=1000, per=1e9)) == 1000
+
+    # retry_after reported by get_user is accurate, not a fixed 60
+    limiter = TokenBucketLimiter(capacity=2, per=10.0)
+    handle_request(get_user, 1, api_key="k", limiter=limiter)
+    handle_request(get_user, 1, api_key="k", limiter=limiter)
+    try:
+        get_user(1, api_key="k", limiter=limiter)
+        assert False, "third request should be limited"
+    except RateLimitError as e:
+        assert e.retry_after == 5
+    print("✓ TokenBucketLimiter works")
+
+
+def test_sharded_limiter():
+    now = [0.0]
+    limiter = ShardedTokenBucketLimiter(capacity=3, per=3.0, shards=8, clock=lambda: now[0])
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == 1.0
+    assert limiter.shard_for("a") is limiter.shard_for("a")
+
+    # Keys spread over the shards
+    for i in range(100):
+        limiter.acquire(f"client-{i}")
+    assert len(limiter) == 101
+    assert sum(1 for shard in limiter._shards if len(shard)) > 1
+
+    # Still exact under concurrency, even with every thread on the same key
+    assert _allowed_under_contention(ShardedTokenBucketLimiter(capacity=1000, per=1e9)) == 1000
+    print("✓ ShardedTokenBucketLimiter works")
+
+
+def test_shared_memory_limiter():
+    now = [0.0]
+    limiter = SharedMemoryLimiter(capacity=3, per=3.0, slots=8, clock=lambda: now[0])
+    try:
+        assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.acquire("a") == 1.0
+        now[0] = 1.0
+        assert limiter.acquire("a") == 0.0
+
+        # The table is fixed-size: full means full...
+        for i in range(7):
+            limiter.acquire(f"k{i}")
+        assert len(limiter) == 8
+        try:
+            limiter.acquire("one-too-many")
+            assert False, "a full table should raise"
+        except RuntimeError:
+            pass
+        # ...until buckets go idle and their slots can be reused
+        now[0] = 10.0
+        assert limiter.acquire("one-too-many") == 0.0
+        assert limiter.acquire("a") == 0.0
+    finally:
+        limiter.unlink()
+
+    # Several processes share one budget
+    limiter = SharedMemoryLimiter(capacity=100, per=1e9, slots=64)
+    try:
+        with ProcessPoolExecutor(4, initializer=_attach_limiter, initargs=(limiter,)) as pool:
+            allowed = sum(pool.map(_hammer, ["shared"] * 8, [50] * 8))
+        assert allowed == 100, allowed
+    finally:
+        limiter.unlink()
+    print("✓ SharedMemoryLimiter works")
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def benchmark_error_paths(n: int = 200_000):
+    """
+    Raise + to_dict() vs returned Err payloads, on success-heavy traffic,
+    error-heavy traffic (bad keys and ids) and a client flooding past its limit.
+    """
+    mixes = {   # name: (calls, limiter capacity)
+        "success-heavy": ([(1, "key")] * 95 + [(999, "key")] * 5, n),
+        "error-heavy": ([(1, None)] * 80 + [(999, "key")] * 10 + [(-1, "key")] * 5 + [(1, "key")] * 5, n),
+        "rate-limited": ([(1, "bot")], 10),   # all but the first 10 requests get a 429
+    }
+    paths = [("raise", handle_request, get_user), ("return Err", handle_request_fast, get_user_fast)]
+    for mix, (calls, capacity) in mixes.items():
+        calls = calls * (n // len(calls))
+        for label, handler, func in paths:
+            limiter = TokenBucketLimiter(capacity=capacity, per=60.0)
+            start = time.perf_counter()
+            for user_id, api_key in calls:
+                handler(func, user_id, api_key=api_key, limiter=limiter)
+            elapsed = time.perf_counter() - start
+            print(f"  {mix:>13} / {label:<10}: {elapsed / len(calls) * 1e9:6.0f} ns per request")
+
+
+def benchmark_limiter(n: int = 500_000, keys: int = 100_000):
+    """acquire() cost, and how many buckets stay resident once traffic moves on."""
+    limiter = TokenBucketLimiter(capacity=10, per=0.5)
+    start = time.perf_counter()
+    for i in range(n):
+        limiter.acquire(f"key-{i % keys}")
+    elapsed = time.perf_counter() - start
+    print(f"  acquire(): {elapsed / n * 1e9:6.0f} ns per call, {len(limiter):,} keys tracked")
+    time.sleep(0.6)
+    limiter.acquire("late-arrival")
+    print(f"  after {limiter.per}s idle: {len(limiter):,} keys tracked")
+
+
+def benchmark_contention(thread_counts=(1, 2, 4, 8, 16, 32, 64), calls: int = 256_000):
+    """
+    Total acquire() throughput as threads are added: one lock vs 16 shards.
+
+    Each thread uses its own keys. Under the GIL only one thread runs Python
+    at a time, so what striping removes is lock hand-off and convoying; on a
+    free-threaded build the gap widens with the core count.
+    """
+    def make_single():
+        return TokenBucketLimiter(capacity=calls, per=1.0)
+    def make_sharded():
+        return ShardedTokenBucketLimiter(capacity=calls, per=1.0, shards=16)
+
+    for label, make in [("one lock", make_single), ("16 shards", make_sharded)]:
+        for n in thread_counts:
+            limiter = make()
+            per_thread = calls // n
+            def work(t):
+                keys = [f"client-{t}-{i}" for i in range(64)]
+                for i in range(per_thread):
+                    limiter.acquire(keys[i & 63])
+            threads = [threading.Thread(target=work, args=(t,)) for t in range(n)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            print(f"  {label:>9}, {n:>2} threads: {per_thread * n / elapsed:>11,.0f} acquires/s")
+
+
+def benchmark_shared_memory(n: int = 200_000, workers: int = 4):
+    """acquire() cost in one process, then n requests spread over worker processes."""
+    local = TokenBucketLimiter(capacity=n, per=1.0)
+    shared = SharedMemoryLimiter(capacity=n, per=1.0, slots=1024)
+    try:
+        for label, limiter in [("in-process", local), ("shared memory", shared)]:
+            start = time.perf_counter()
+            for i in range(n):
+                limiter.acquire(f"client-{i & 255}")
+            elapsed = time.perf_counter() - start
+            print(f"  {label:>13}: {elapsed / n * 1e9:6.0f} ns per acquire()")
+
+        shared.clear()
+        with ProcessPoolExecutor(workers, initializer=_attach_limiter, initargs=(shared,)) as pool:
+            start = time.perf_counter()
+            allowed = sum(pool.map(_hammer, ["hot"] * workers, [n // workers] * workers))
+            elapsed = time.perf_counter() - start
+        print(f"  {workers} processes: {n / elapsed:>9,.0f} acquires/s, {allowed:,} allowed")
+    finally:
+        shared.unlink()
+
+
 if __name__ == "__main__":
     test_hierarchy()
     test_to_dict()
@@ -198,4 +707,17 @@ if __name__ == "__main__":
     test_rate_limit()
     test_get_user()
     test_rate_limiting()
+    test_handle_request_fast()
+    test_token_bucket()
+    test_sharded_limiter()
+    test_shared_memory_limiter()
     print("\nAll tests passed! ✓")
+
+    print("\nBenchmark: raised vs returned errors")
+    benchmark_error_paths()
+    print("\nBenchmark: token-bucket limiter")
+    benchmark_limiter()
+    print("\nBenchmark: lock contention, 1 to 64 threads")
+    benchmark_contention()
+    print("\nBenchmark: shared-memory limiter across processes")
+    benchmark_shared_memory()
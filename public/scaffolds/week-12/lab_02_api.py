@@ -9,10 +9,37 @@ Install: pip install fastapi uvicorn
 Run: uvicorn lab_02_api:app --reload
 """
 
-from fastapi import FastAPI, HTTPException
+import math
+
+from fastapi import Depends, FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="Task Manager API")
+try:
+    from lab_02_exceptions import TokenBucketLimiter   # Lab 8.2 — copy it next to this file
+except ImportError:
+    TokenBucketLimiter = None
+
+
+# ============================================================
+# Rate Limiting
+# ============================================================
+
+limiter = TokenBucketLimiter(capacity=60, per=60.0) if TokenBucketLimiter else None
+
+
+def rate_limit(request: Request):
+    """
+    Dependency run before every route: 60 requests per minute per client.
+
+    Key clients by their X-API-Key header, falling back to request.client.host.
+    If limiter.acquire(key) returns a wait > 0, raise HTTPException(429) with a
+    "Retry-After" header of math.ceil(wait) seconds. Do nothing if limiter is None.
+    """
+    # TODO: Implement
+    pass
+
+
+app = FastAPI(title="Task Manager API", dependencies=[Depends(rate_limit)])
 
 
 # ============================================================
@@ -188,5 +215,28 @@ def test_api():
     print("\nAll API tests passed! ✓")
 
 
+def test_rate_limit():
+    if TokenBucketLimiter is None:
+        print("- skipping rate limit test (lab_02_exceptions.py not found)")
+        return
+    from fastapi.testclient import TestClient
+    client = TestClient(app)
+
+    global limiter
+    saved, limiter = limiter, TokenBucketLimiter(capacity=2, per=60.0)
+    try:
+        headers = {"X-API-Key": "flood"}
+        assert client.get("/tasks", headers=headers).status_code == 200
+        assert client.get("/tasks", headers=headers).status_code == 200
+        resp = client.get("/tasks", headers=headers)
+        assert resp.status_code == 429
+        assert int(resp.headers["Retry-After"]) == 30
+        assert client.get("/tasks", headers={"X-API-Key": "other"}).status_code == 200
+    finally:
+        limiter = saved
+    print("✓ Rate limiting works")
+
+
 if __name__ == "__main__":
     test_api()
+    test_rate_limit()